@@ -0,0 +1,79 @@
+"""Diffing two versions of a model with `Model.diff` versus comparing the
+JSON dumps of their elements.
+
+The model is made by merging many renamed copies of an Annex A example
+model, and a few elements of a second copy of it are renamed. Reports the
+time to hash a model, and to diff the two models with their hashes made
+and through their JSON dumps.
+
+    python benchmarks/bench_diff.py [number of copies] [repeats]
+"""
+
+import json
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from bench_parallel_load import make_fixture  # noqa: E402
+from bench_snapshot import best_time  # noqa: E402
+
+from pymbe.merkle import MerkleTree  # noqa: E402
+from pymbe.metamodel import get_shared_metamodel  # noqa: E402
+from pymbe.model import Model  # noqa: E402
+
+NUMBER_OF_CHANGES = 5
+
+
+def diff_dumps(old: Model, new: Model) -> set[str]:
+    old_dumps = {
+        id_: json.dumps(element._data) for id_, element in old.elements.items()
+    }
+    new_dumps = {
+        id_: json.dumps(element._data) for id_, element in new.elements.items()
+    }
+    return {
+        id_
+        for id_ in old_dumps.keys() | new_dumps.keys()
+        if old_dumps.get(id_) != new_dumps.get(id_)
+    }
+
+
+def main():
+    number_of_copies = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    warnings.simplefilter("ignore")
+    get_shared_metamodel()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepaths = make_fixture(Path(directory), number_of_copies)
+        old = Model.load_from_mult_post_files(filepaths)
+        new = Model.load_from_mult_post_files(filepaths)
+        print(f"{len(new.elements)} elements")
+
+        named = [
+            element
+            for element in new.elements.values()
+            if element._data.get("declaredName")
+        ]
+        for element in named[:: len(named) // NUMBER_OF_CHANGES][:NUMBER_OF_CHANGES]:
+            element.set("declaredName", f"{element._data['declaredName']}Renamed")
+        diff = old.diff(new)
+        modified = {*diff.modified_elements, *diff.modified_relationships}
+        assert modified == diff_dumps(old, new)
+        print(f"{len(modified)} modified elements and relationships")
+
+        timings = {
+            "hash": lambda: MerkleTree.from_model(new),
+            "diff": lambda: old.diff(new),
+            "diff dumps": lambda: diff_dumps(old, new),
+        }
+        for label, function in timings.items():
+            print(f"{label:>12}: {best_time(function, repeats) * 1e3:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Memory used per element by a loaded model.
+
+Reports the total memory traced while loading each Annex A example model
+(element data included), and the memory of the `Element` objects alone,
+i.e., without their data dictionaries.
+
+    python benchmarks/bench_element_memory.py
+"""
+
+import sys
+import tracemalloc
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from pymbe.metamodel import get_shared_metamodel  # noqa: E402
+from pymbe.model import Model  # noqa: E402
+
+FIXTURES = ROOT / "dev_docs" / "functionality" / "annex_a_data"
+
+
+def element_shell_size(element) -> int:
+    """Size of the element object and the containers it owns, but not its
+    data.
+    """
+    size = sys.getsizeof(element)
+    if hasattr(element, "__dict__"):
+        size += sys.getsizeof(element.__dict__)
+    derived = object.__getattribute__(element, "_derived")
+    size += sys.getsizeof(derived)
+    return size
+
+
+def main():
+    warnings.simplefilter("ignore")
+    get_shared_metamodel()
+
+    print(
+        f"{'model':>28} {'elements':>9} {'total/element':>14} {'Element/element':>16}"
+    )
+    for model_file in sorted(FIXTURES.glob("*.json")):
+        tracemalloc.start()
+        model = Model.load_from_file(model_file)
+        total, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        number_of_elements = len(model.elements)
+        shell = sum(map(element_shell_size, model.elements.values()))
+        print(
+            f"{model_file.stem:>28} {number_of_elements:>9} "
+            f"{total / number_of_elements:>12.0f} B "
+            f"{shell / number_of_elements:>14.0f} B"
+        )
+
+
+if __name__ == "__main__":
+    main()
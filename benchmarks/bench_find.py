@@ -0,0 +1,67 @@
+"""Finding elements with `Model.find` versus scanning all the elements.
+
+The model is made by merging many renamed copies of an Annex A example
+model. Reports the time of a query by metatype (with its subtypes) and
+attribute value, scanning the elements and through the attribute indexes,
+the first time (which makes the indexes) and after that.
+
+    python benchmarks/bench_find.py [number of copies] [repeats]
+"""
+
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from bench_parallel_load import make_fixture  # noqa: E402
+from bench_snapshot import best_time  # noqa: E402
+
+from pymbe.metamodel import get_shared_metamodel  # noqa: E402
+from pymbe.model import Model  # noqa: E402
+
+METATYPE = "Feature"
+ATTRIBUTE, VALUE = "direction", "out"
+
+
+def scan(model: Model) -> list:
+    metatypes = model.metamodel.get_subtypes(METATYPE)
+    return [
+        element
+        for element in model.elements.values()
+        if element._metatype in metatypes and element._data.get(ATTRIBUTE) == VALUE
+    ]
+
+
+def main():
+    number_of_copies = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    warnings.simplefilter("ignore")
+    get_shared_metamodel()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepaths = make_fixture(Path(directory), number_of_copies)
+        model = Model.load_from_mult_post_files(filepaths)
+        print(f"{len(model.elements)} elements")
+
+        def find():
+            return model.find(METATYPE, **{ATTRIBUTE: VALUE})
+
+        start = time.perf_counter()
+        found = find()
+        first = time.perf_counter() - start
+        assert sorted(element._id for element in found) == sorted(
+            element._id for element in scan(model)
+        )
+        print(f"found {len(found)} elements")
+
+        print(f"{'scan':>12}: {best_time(lambda: scan(model), repeats) * 1e3:9.3f} ms")
+        print(f"{'first find':>12}: {first * 1e3:9.3f} ms")
+        print(f"{'find':>12}: {best_time(find, repeats) * 1e3:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Cold-start time of `Model.load_from_file` with and without the marshalled
+metamodel hints cache.
+
+Every measurement runs in a fresh interpreter, so module imports and the
+metamodel load are included, as they would be for a new job.
+
+    python benchmarks/bench_metamodel_cache.py [model.json] [repeats]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+
+ROOT = Path(__file__).parents[1]
+DEFAULT_MODEL = (
+    ROOT
+    / "dev_docs"
+    / "functionality"
+    / "annex_a_data"
+    / "A-3-2-WithoutConnectors.json"
+)
+
+COLD_START = """
+import time
+start = time.perf_counter()
+from pymbe.metamodel import MetaModel, set_shared_metamodel
+from pymbe.model import Model
+set_shared_metamodel(MetaModel(use_cache={use_cache}))
+Model.load_from_file({model_file!r})
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(model_file: Path, use_cache: bool, cache_dir: str) -> float:
+    env = os.environ | {
+        "PYMBE_CACHE_DIR": cache_dir,
+        "PYTHONPATH": str(ROOT / "src"),
+        "PYTHONWARNINGS": "ignore",
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            COLD_START.format(use_cache=use_cache, model_file=str(model_file)),
+        ],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    model_file = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MODEL
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # populate the cache once, like the first run after installing
+        cold_start(model_file, use_cache=True, cache_dir=cache_dir)
+
+        for label, use_cache in (("without cache", False), ("with cache", True)):
+            timings = [
+                cold_start(model_file, use_cache=use_cache, cache_dir=cache_dir)
+                for _ in range(repeats)
+            ]
+            print(
+                f"{label:>14}: median {median(timings) * 1000:7.1f} ms, "
+                f"min {min(timings) * 1000:7.1f} ms ({repeats} runs, {model_file.name})"
+            )
+
+
+if __name__ == "__main__":
+    main()
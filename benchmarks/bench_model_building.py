@@ -0,0 +1,107 @@
+"""Time taken to build a model with the model modification builders, for
+growing model sizes.
+
+Each step adds a classifier specializing the previous one and a feature
+typed by it, like the elements made by the Annex A executor. With constant
+time bookkeeping in `Model._add_element` the time per classifier should
+stay flat as the model grows. The model is built both one element at a time
+and in a single `Model.batch`.
+
+    python benchmarks/bench_model_building.py [sizes...]
+"""
+
+import gc
+import sys
+import time
+import warnings
+from contextlib import nullcontext
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from pymbe.metamodel import get_shared_metamodel  # noqa: E402
+from pymbe.model import Element, Model  # noqa: E402
+from pymbe.model_modification import (  # noqa: E402
+    build_from_classifier_pattern,
+    build_from_feature_pattern,
+    new_element_ownership_pattern,
+)
+
+SIZES = (500, 1000, 2000, 4000)
+
+
+def build_model(number_of_classifiers: int, batch: bool = False) -> Model:
+    model = Model(elements={})
+    namespace = Element.new(
+        data={
+            "aliasIds": [],
+            "isImpliedIncluded": False,
+            "@type": "Namespace",
+            "@id": "namespace",
+            "ownedRelationship": [],
+        },
+        model=model,
+    )
+    package = Element.new(
+        data={
+            "declaredName": "Package",
+            "isLibraryElement": False,
+            "filterCondition": [],
+            "ownedElement": [],
+            "@type": "Package",
+            "@id": "package",
+            "ownedRelationship": [],
+        },
+        model=model,
+    )
+    new_element_ownership_pattern(owner=namespace, ele=package, model=model)
+
+    with model.batch() if batch else nullcontext():
+        add_classifiers(model, package, number_of_classifiers)
+    return model
+
+
+def add_classifiers(model: Model, package: Element, number_of_classifiers: int):
+    general = None
+    for index in range(number_of_classifiers):
+        classifier = build_from_classifier_pattern(
+            owner=package,
+            name=f"Classifier{index}",
+            model=model,
+            metatype="Classifier",
+            superclasses=[general] if general else [],
+            specific_fields={},
+        )
+        build_from_feature_pattern(
+            owner=classifier,
+            name=f"feature{index}",
+            model=model,
+            specific_fields={},
+            feature_type=general or classifier,
+        )
+        general = classifier
+
+
+def main():
+    warnings.simplefilter("ignore")
+    get_shared_metamodel()
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+
+    print(f"{'classifiers':>12} {'elements':>9} {'one at a time':>14} {'batched':>9}")
+    for size in sizes:
+        timings = []
+        for batch in (False, True):
+            model = None
+            gc.collect()
+            start = time.perf_counter()
+            model = build_model(size, batch=batch)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{size:>12} {len(model.elements):>9} "
+            f"{timings[0]:>12.2f} s {timings[1]:>7.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Cost of looking up items by name in a `ListOfNamedItems`.
+
+Looks up every member of a list of 10,000 classifiers by name, once with the
+name index kept between lookups and once rebuilding it for every lookup (as
+was done before the index was cached), and then names that are not in the
+list, which only rebuild the index after the model changes.
+
+    python benchmarks/bench_named_item_lookup.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from pymbe.model import ListOfNamedItems, Model  # noqa: E402
+
+NUMBER_OF_MEMBERS = 10_000
+NUMBER_OF_LOOKUPS = 200
+
+
+def main():
+    model = Model.load(
+        elements=[
+            {
+                "@id": f"classifier-{index}",
+                "@type": "Classifier",
+                "declaredName": f"C{index}",
+            }
+            for index in range(NUMBER_OF_MEMBERS)
+        ]
+    )
+    members = ListOfNamedItems(model.elements.values())
+    names = [
+        f"C{index}"
+        for index in range(0, NUMBER_OF_MEMBERS, NUMBER_OF_MEMBERS // NUMBER_OF_LOOKUPS)
+    ]
+
+    def cached_lookups():
+        for name in names:
+            assert members[name]._data["declaredName"] == name
+
+    def rebuilt_lookups():
+        for name in names:
+            members._name_index = None
+            assert members[name]._data["declaredName"] == name
+
+    def missed_lookups():
+        for name in names:
+            assert members[f"not {name}"] is None
+
+    members.append(members[0])  # drop the index, so the first lookup builds it
+    first = timeit.timeit(lambda: members[names[0]], number=1)
+    cached = min(timeit.repeat(cached_lookups, number=1, repeat=5)) / len(names)
+    rebuilt = min(timeit.repeat(rebuilt_lookups, number=1, repeat=5)) / len(names)
+    missed = min(timeit.repeat(missed_lookups, number=1, repeat=5)) / len(names)
+
+    print(f"{NUMBER_OF_MEMBERS} members")
+    print(f"{'first lookup (builds the index)':>36}: {first * 1e3:9.3f} ms")
+    print(f"{'lookup with the cached index':>36}: {cached * 1e6:9.3f} us")
+    print(f"{'lookup rebuilding the index':>36}: {rebuilt * 1e6:9.3f} us")
+    print(f"{'lookup of a missing name':>36}: {missed * 1e6:9.3f} us")
+
+
+if __name__ == "__main__":
+    main()
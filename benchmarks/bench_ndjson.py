@@ -0,0 +1,58 @@
+"""Loading a model from a JSON array versus newline-delimited JSON.
+
+The model is made by merging many renamed copies of an Annex A example
+model. Reports the time to load the model from each file, decoding the
+NDJSON file in one go and in chunks across a pool of processes.
+
+    python benchmarks/bench_ndjson.py [number of copies] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from bench_parallel_load import make_fixture  # noqa: E402
+from bench_snapshot import best_time  # noqa: E402
+
+from pymbe.metamodel import get_shared_metamodel  # noqa: E402
+from pymbe.model import Model  # noqa: E402
+
+
+def main():
+    number_of_copies = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    warnings.simplefilter("ignore")
+    get_shared_metamodel()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        model = Model.load_from_mult_post_files(
+            make_fixture(directory, number_of_copies)
+        )
+        json_file = directory / "model.json"
+        model.save_to_file(json_file, indent=None)
+        ndjson_file = directory / "model.ndjson"
+        model.save_to_ndjson_file(ndjson_file)
+
+        print(
+            f"{len(model.elements)} elements, JSON {json_file.stat().st_size / 1e6:.1f} MB, "
+            f"NDJSON {ndjson_file.stat().st_size / 1e6:.1f} MB, {os.cpu_count()} cores"
+        )
+        timings = {
+            "JSON": lambda: Model.load_from_file(json_file),
+            "NDJSON": lambda: Model.load_from_ndjson_file(ndjson_file),
+            "NDJSON, pool": lambda: Model.load_from_ndjson_file(
+                ndjson_file, parallel=True
+            ),
+        }
+        for label, function in timings.items():
+            print(f"{label:>14}: {best_time(function, repeats) * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Trying out a change on an overlay model versus loading the model again.
+
+The model is made by merging many renamed copies of an Annex A example
+model. Reports the time to load it, to make an overlay of it, and to add a
+classifier to an overlay, then how many elements the overlay made and copied.
+
+    python benchmarks/bench_overlay.py [number of copies] [repeats]
+"""
+
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from bench_parallel_load import make_fixture  # noqa: E402
+from bench_snapshot import best_time  # noqa: E402
+
+from pymbe.metamodel import get_shared_metamodel  # noqa: E402
+from pymbe.model import Model  # noqa: E402
+from pymbe.model_modification import build_from_classifier_pattern  # noqa: E402
+
+
+def add_classifier(model: Model):
+    package = model.get_element(model.packages[0]._id)
+    build_from_classifier_pattern(
+        owner=package,
+        name="Scenario",
+        model=model,
+        metatype="Classifier",
+        superclasses=[],
+        specific_fields={},
+    )
+
+
+def main():
+    number_of_copies = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    warnings.simplefilter("ignore")
+    get_shared_metamodel()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepaths = make_fixture(Path(directory), number_of_copies)
+        base = Model.load_from_mult_post_files(filepaths)
+        print(f"{len(base.elements)} elements")
+
+        timings = {
+            "load": lambda: Model.load_from_mult_post_files(filepaths),
+            "overlay": base.overlay,
+            "overlay + change": lambda: add_classifier(base.overlay()),
+        }
+        for label, function in timings.items():
+            print(f"{label:>18}: {best_time(function, repeats) * 1e3:9.3f} ms")
+
+        overlay = base.overlay()
+        add_classifier(overlay)
+        made = len(overlay.elements._own)
+        copied = made - len(overlay._shared_ids) - len(overlay.elements._added)
+        print(f"made {made} elements in the overlay, copied the data of {copied}")
+
+
+if __name__ == "__main__":
+    main()
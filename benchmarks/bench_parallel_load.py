@@ -0,0 +1,81 @@
+"""Sequential versus process-pool loading of a model split across many
+POST-format JSON files.
+
+The fixture is made by copying an Annex A example model into many files,
+renaming the ids in each copy so the files do not overlap.
+
+Only the decoding of the files runs in the pool: the parent process still
+has to unmarshal the decoded data and build the elements, so the speed-up
+is bounded by how much slower decoding is than unmarshalling.
+
+    python benchmarks/bench_parallel_load.py [number of files] [repeats]
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from pymbe.metamodel import get_shared_metamodel  # noqa: E402
+from pymbe.model import Model  # noqa: E402
+
+SOURCE_MODEL = (
+    ROOT / "dev_docs" / "functionality" / "annex_a_data" / "A-3-6-Sequences.json"
+)
+UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def make_fixture(directory: Path, number_of_files: int) -> list[Path]:
+    text = SOURCE_MODEL.read_text(encoding="utf-8")
+    filepaths = []
+    for index in range(number_of_files):
+        filepath = directory / f"part_{index:03d}.json"
+        filepath.write_text(
+            UUID.sub(lambda match, i=index: f"{i:08x}{match.group()[8:]}", text),
+            encoding="utf-8",
+        )
+        filepaths.append(filepath)
+    return filepaths
+
+
+def time_load(filepaths: list[Path], repeats: int, **kwargs) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        Model.load_from_mult_post_files(filepaths, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    number_of_files = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    warnings.simplefilter("ignore")
+    get_shared_metamodel()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepaths = make_fixture(Path(directory), number_of_files)
+        size = sum(filepath.stat().st_size for filepath in filepaths) / 1e6
+        print(f"{number_of_files} files, {size:.1f} MB, {os.cpu_count()} cores")
+
+        sequential = time_load(filepaths, repeats)
+        print(f"{'sequential':>12}: {sequential:6.3f} s")
+
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            parallel = time_load(filepaths, repeats, parallel=True, max_workers=workers)
+            print(
+                f"{workers:>4} workers: {parallel:6.3f} s "
+                f"({sequential / parallel:.2f}x sequential)"
+            )
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
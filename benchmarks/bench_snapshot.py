@@ -0,0 +1,71 @@
+"""Opening a model from a binary snapshot versus loading it from JSON.
+
+The model is made by merging many renamed copies of an Annex A example
+model. Reports the time to load (or open) the model and get one element
+from it, and the file sizes.
+
+    python benchmarks/bench_snapshot.py [number of copies] [repeats]
+"""
+
+import json
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from bench_parallel_load import make_fixture  # noqa: E402
+
+from pymbe.metamodel import get_shared_metamodel  # noqa: E402
+from pymbe.model import Model  # noqa: E402
+from pymbe.serialization import read_element_data_file  # noqa: E402
+
+
+def best_time(function, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    number_of_copies = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    warnings.simplefilter("ignore")
+    get_shared_metamodel()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        element_data = [
+            data
+            for filepath in make_fixture(directory, number_of_copies)
+            for data in read_element_data_file(filepath)
+        ]
+        json_file = directory / "model.json"
+        json_file.write_text(json.dumps(element_data), encoding="utf-8")
+        snapshot_file = directory / "model.snapshot"
+        Model.load_from_file(json_file).save_snapshot(snapshot_file)
+        some_id = element_data[len(element_data) // 2]["@id"]
+
+        print(
+            f"{len(element_data)} elements, JSON {json_file.stat().st_size / 1e6:.1f} MB, "
+            f"snapshot {snapshot_file.stat().st_size / 1e6:.1f} MB"
+        )
+        timings = {
+            "JSON": lambda: Model.load_from_file(json_file).get_element(some_id),
+            "JSON, lazy": lambda: Model.load_from_file(
+                json_file, lazy=True
+            ).get_element(some_id),
+            "snapshot": lambda: Model.open_snapshot(snapshot_file).get_element(some_id),
+        }
+        for label, function in timings.items():
+            print(f"{label:>12}: {best_time(function, repeats) * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
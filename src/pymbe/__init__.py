@@ -0,0 +1,7 @@
+from importlib.metadata import PackageNotFoundError, version
+
+try:
+    __version__ = version("pymbe")
+except PackageNotFoundError:
+    # e.g., running from a source checkout that was not installed
+    __version__ = "unknown"
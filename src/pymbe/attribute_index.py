@@ -0,0 +1,73 @@
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, Any
+
+from pymbe.changes import ChangeKind, ModelChange
+
+if TYPE_CHECKING:
+    from pymbe.model import Element, Model
+
+MISSING = object()
+
+
+class AttributeIndex:
+    """Secondary indexes of the elements of a model by the values of their
+    attributes, e.g., the ids of all the elements with `isAbstract` True.
+
+    The index of an attribute is made the first time it is queried, and is
+    then kept up to date as elements are added or have their attributes set.
+    Elements without the attribute, or with an unhashable value (e.g., a
+    list), are not in its index.
+    """
+
+    def __init__(self, model: "Model"):
+        self._model = model
+        # the ids of the elements with each value of an attribute, in model order
+        self._ids_by_value: dict[str, dict[Any, dict[str, None]]] = {}
+        # the value under which each element is indexed, by attribute
+        self._values: dict[str, dict[str, Any]] = {}
+        model.subscribe(self._follow_change)
+
+    def get_ids(self, attribute: str, value: Hashable) -> dict[str, None]:
+        """The ids of the elements whose attribute has a value, as the keys
+        of a dictionary, so it can be tested for membership.
+        """
+        if attribute not in self._ids_by_value:
+            self._index_attribute(attribute)
+        return self._ids_by_value[attribute].get(value, {})
+
+    def __contains__(self, attribute: str) -> bool:
+        return attribute in self._ids_by_value
+
+    def _index_attribute(self, attribute: str):
+        self._ids_by_value[attribute] = {}
+        self._values[attribute] = {}
+        for element in self._model.elements.values():
+            self._add(attribute, element)
+
+    def _add(self, attribute: str, element: "Element"):
+        value = element._data.get(attribute, MISSING)
+        if value is MISSING or not isinstance(value, Hashable):
+            return
+        self._values[attribute][element._id] = value
+        self._ids_by_value[attribute].setdefault(value, {})[element._id] = None
+
+    def _remove(self, attribute: str, element_id: str):
+        value = self._values[attribute].pop(element_id, MISSING)
+        if value is MISSING:
+            return
+        ids = self._ids_by_value[attribute][value]
+        del ids[element_id]
+        if not ids:
+            del self._ids_by_value[attribute][value]
+
+    def _follow_change(self, change: ModelChange):
+        element = change.element
+        if change.kind is ChangeKind.ELEMENT_ADDED:
+            attributes = self._ids_by_value
+        elif change.kind is ChangeKind.ATTRIBUTE_SET and change.attribute in self:
+            attributes = (change.attribute,)
+        else:
+            return
+        for attribute in attributes:
+            self._remove(attribute, element._id)
+            self._add(attribute, element)
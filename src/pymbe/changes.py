@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pymbe.model import Element
+
+
+class ChangeKind(Enum):
+    """The kinds of changes made to a model."""
+
+    ELEMENT_ADDED = "element_added"
+    RELATIONSHIP_ADDED = "relationship_added"
+    ATTRIBUTE_SET = "attribute_set"
+
+
+@dataclass(frozen=True)
+class ModelChange:
+    """A change made to a model, as given to the model's subscribers."""
+
+    kind: ChangeKind
+    element: "Element"
+    revision: int  # The revision of the model after the change
+    attribute: str | None = None  # The attribute set, for ATTRIBUTE_SET changes
@@ -9,6 +9,7 @@ import traitlets as trt
 from dateutil import parser
 
 from .model import Model, ModelClient
+from .serialization import make_reference_hook
 
 URL_CACHE_SIZE = 1024
 
@@ -138,8 +139,13 @@ class APIClient(trt.HasTraits, ModelClient):
 
     @lru_cache(maxsize=URL_CACHE_SIZE)
     def _retrieve_data(self, url: str) -> list[dict]:
-        """Retrieve model data from a URL using pagination."""
+        """Retrieve model data from a URL using pagination.
+
+        The references, ids and metatypes in the data are shared between the
+        decoded elements of all the pages (see `make_reference_hook`).
+        """
         result = []
+        share_references = make_reference_hook({})
         while url:
             response = requests.get(url)
 
@@ -147,7 +153,7 @@ class APIClient(trt.HasTraits, ModelClient):
                 raise requests.HTTPError(
                     f"Failed to retrieve elements from '{url}', reason: {response.reason}"
                 )
-            data = response.json()
+            data = response.json(object_hook=share_references)
             if not isinstance(data, list):
                 return data
             result += data
@@ -0,0 +1,66 @@
+import gc
+import threading
+from importlib import resources as lib_resources
+
+from pymbe.model import Model
+
+LIBRARY_FILE = "KernelLibrary.json"
+
+_shared_library_lock = threading.Lock()
+
+
+def load_library() -> Model:
+    """Load the KerML library from the static data, through the model cache
+    (see `Model.load_cached`).
+    """
+    library_data = lib_resources.files("pymbe.static_data").joinpath(LIBRARY_FILE)
+    with lib_resources.as_file(library_data) as library_file:
+        return Model.load_cached(library_file)
+
+
+def get_shared_library() -> Model:
+    """Return the process-wide, read-only KerML library model, loading it the
+    first time it is needed.
+
+    Models use it through `model.reference_other_model(get_shared_library())`,
+    which does not copy it. All of its elements are made when it is loaded
+    and it cannot be changed afterwards, so it can be read from several
+    threads at once. Processes forked after it is loaded inherit it instead
+    of loading it again (see `freeze_for_fork`).
+    """
+    if Model.shared_library is None:
+        with _shared_library_lock:
+            if Model.shared_library is None:
+                Model.shared_library = _make_shared(load_library())
+    return Model.shared_library
+
+
+def set_shared_library(library: Model | None):
+    """Replace the process-wide library model, making it read-only.
+
+    Passing `None` drops the current one, so the next call to
+    `get_shared_library` loads it again.
+    """
+    with _shared_library_lock:
+        Model.shared_library = None if library is None else _make_shared(library)
+
+
+def freeze_for_fork() -> Model:
+    """Load the shared library, if needed, and move it, with everything else
+    made so far, to the permanent generation of the garbage collector.
+
+    Call it once before forking worker processes (e.g., in a server that
+    preloads the library): the garbage collectors of the workers then leave
+    the library alone, so its memory pages stay shared with the parent
+    instead of being copied. `gc.unfreeze()` undoes it.
+    """
+    library = get_shared_library()
+    gc.freeze()
+    return library
+
+
+def _make_shared(library: Model) -> Model:
+    # make everything up front, so reading the library never changes it
+    library.materialize()
+    library._read_only = True
+    return library
@@ -0,0 +1,166 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from pymbe.ownership import NO_PARENT
+
+if TYPE_CHECKING:
+    from pymbe.model import Model
+
+DIGEST_SIZE = 16
+
+
+def hash_element_data(data: dict) -> bytes:
+    """A hash of the content of an element, which does not depend on the
+    order of its attributes.
+    """
+    text = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(text.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+@dataclass(frozen=True)
+class MerkleTree:
+    """The hashes of the content of the elements of a model, and of the
+    subtrees of the ownership tree under each of them.
+
+    The hash of a subtree combines the content hash of its root with the
+    hashes of the subtrees under it, so two models whose subtrees under an
+    element have the same hash hold the same elements there.
+    """
+
+    content_hashes: dict[str, bytes]
+    subtree_hashes: dict[str, bytes]
+    children: dict[str, list[str]]  # the ids of the elements owned by each one
+    roots: list[str]  # the ids of the elements without an owner in the model
+
+    @staticmethod
+    def from_model(model: "Model") -> "MerkleTree":
+        ownership = model.ownership
+        ids, parents = ownership.ids, ownership.parents
+        elements = model.elements
+
+        content_hashes = {id_: hash_element_data(elements[id_]._data) for id_ in ids}
+        child_hashes: dict[int, list[bytes]] = {}
+        subtree_hashes = {}
+        # owned elements come after their owners in the ownership tour
+        for position in range(len(ids) - 1, -1, -1):
+            id_ = ids[position]
+            digest = hashlib.blake2b(content_hashes[id_], digest_size=DIGEST_SIZE)
+            # sorted, so the hash does not depend on the order the elements were loaded
+            for child_hash in sorted(child_hashes.pop(position, ())):
+                digest.update(child_hash)
+            subtree_hashes[id_] = digest.digest()
+            parent = parents[position]
+            if parent != NO_PARENT:
+                child_hashes.setdefault(parent, []).append(subtree_hashes[id_])
+
+        children: dict[str, list[str]] = {}
+        roots = []
+        for id_, parent in zip(ids, parents):
+            if parent == NO_PARENT:
+                roots.append(id_)
+            else:
+                children.setdefault(ids[parent], []).append(id_)
+
+        return MerkleTree(
+            content_hashes=content_hashes,
+            subtree_hashes=subtree_hashes,
+            children=children,
+            roots=roots,
+        )
+
+    def get_subtree(self, element_id: str) -> list[str]:
+        """The ids of an element and all the elements under it."""
+        ids = [element_id]
+        for id_ in ids:
+            ids += self.children.get(id_, ())
+        return ids
+
+
+@dataclass(frozen=True)
+class ModelDiff:
+    """The ids of the elements and relationships added, removed and modified
+    from one model to another.
+    """
+
+    added_elements: list[str]
+    removed_elements: list[str]
+    modified_elements: list[str]
+    added_relationships: list[str]
+    removed_relationships: list[str]
+    modified_relationships: list[str]
+
+    def __bool__(self) -> bool:
+        return any(
+            (
+                self.added_elements,
+                self.removed_elements,
+                self.modified_elements,
+                self.added_relationships,
+                self.removed_relationships,
+                self.modified_relationships,
+            )
+        )
+
+
+def diff_models(old: "Model", new: "Model") -> ModelDiff:
+    """Find the changes from one model to another (e.g., the same model at
+    two commits) by comparing their Merkle trees, only visiting the subtrees
+    whose hashes differ.
+
+    Elements that changed owner are modified, rather than removed and added.
+    """
+    old_tree, new_tree = old.merkle_tree, new.merkle_tree
+    added, removed, modified = [], [], []
+    # the ids of the elements in both models whose subtrees differ
+    pending = []
+
+    def compare(old_ids: list[str], new_ids: list[str]):
+        new_id_set = set(new_ids)
+        for id_ in old_ids:
+            if id_ not in new_id_set:
+                removed.extend(old_tree.get_subtree(id_))
+        old_id_set = set(old_ids)
+        for id_ in new_ids:
+            if id_ not in old_id_set:
+                added.extend(new_tree.get_subtree(id_))
+            elif old_tree.subtree_hashes[id_] != new_tree.subtree_hashes[id_]:
+                if old_tree.content_hashes[id_] != new_tree.content_hashes[id_]:
+                    modified.append(id_)
+                pending.append(id_)
+
+    compare(old_tree.roots, new_tree.roots)
+    while pending:
+        id_ = pending.pop()
+        compare(old_tree.children.get(id_, []), new_tree.children.get(id_, []))
+
+    # elements moved to another owner are found under both
+    moved = set(added).intersection(removed)
+    if moved:
+        modified += [
+            id_
+            for id_ in added
+            if id_ in moved
+            and old_tree.content_hashes[id_] != new_tree.content_hashes[id_]
+        ]
+        added = [id_ for id_ in added if id_ not in moved]
+        removed = [id_ for id_ in removed if id_ not in moved]
+
+    def split(ids: list[str], model: "Model") -> tuple[list[str], list[str]]:
+        elements = model.elements
+        relationships = [id_ for id_ in ids if elements[id_]._is_relationship]
+        relationship_ids = set(relationships)
+        return [id_ for id_ in ids if id_ not in relationship_ids], relationships
+
+    added_elements, added_relationships = split(added, new)
+    removed_elements, removed_relationships = split(removed, old)
+    modified_elements, modified_relationships = split(modified, new)
+    return ModelDiff(
+        added_elements=added_elements,
+        removed_elements=removed_elements,
+        modified_elements=modified_elements,
+        added_relationships=added_relationships,
+        removed_relationships=removed_relationships,
+        modified_relationships=modified_relationships,
+    )
@@ -1,12 +1,108 @@
+import hashlib
 import json
+import marshal
+import os
+import threading
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import cache
 from importlib import resources as lib_resources
+from pathlib import Path
+from types import MappingProxyType
 from typing import Any, ClassVar
 
 from pymbe.query.metamodel_navigator import get_more_general_types
 
 # TODO: Is there a way to restore type hints for Element without inducing a circular dependency?
 
+_shared_metamodel_lock = threading.Lock()
+
+METAHINTS_FILE = "attribute_metadata.json"
+SUPERTYPES_FILE = "metaclass_supertypes.json"
+
+
+def get_cache_dir() -> Path:
+    """Directory for pymbe's on-disk caches, `PYMBE_CACHE_DIR` if set,
+    otherwise the user's cache directory.
+    """
+    cache_dir = os.environ.get("PYMBE_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+    user_cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(user_cache) / "pymbe"
+
+
+def write_cache_file(
+    cache_file: Path, write: Callable[[Path], None], stale_pattern: str
+):
+    """Write a file to the cache directory with `write`, after removing the
+    files matching `stale_pattern` (e.g., copies keyed by an older hash).
+
+    The file is written under a temporary name and then renamed, so
+    concurrent readers never see a partial file.
+    """
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        for stale_file in cache_file.parent.glob(stale_pattern):
+            stale_file.unlink(missing_ok=True)
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        write(temp_file)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        # the cache is only an optimization, carry on if it cannot be written
+        pass
+
+
+def read_metahints_file() -> bytes:
+    return (
+        lib_resources.files("pymbe.static_data").joinpath(METAHINTS_FILE).read_bytes()
+    )
+
+
+def hash_metahints(raw_hints: bytes) -> str:
+    return hashlib.sha256(raw_hints).hexdigest()[:16]
+
+
+@cache
+def get_metahints_digest() -> str:
+    """A short hash of the attribute hints, to key the caches made with them."""
+    return hash_metahints(read_metahints_file())
+
+
+def load_metahints(use_cache: bool = True) -> dict[str, dict[str, dict[str, Any]]]:
+    """Load the attribute hints, going through a marshalled copy of the JSON
+    file in the cache directory when possible.
+
+    The copy is keyed by the hash of the JSON file, so it is rebuilt whenever
+    the JSON file changes, and it is rebuilt too if it cannot be read back as
+    hints. The cache directory is trusted not to hold malicious files, as
+    `marshal` does not guard against them (though, unlike `pickle`, it does
+    not run code when loading).
+    """
+    raw_hints = read_metahints_file()
+    if not use_cache:
+        return json.loads(raw_hints)
+
+    digest = hash_metahints(raw_hints)
+    cache_file = get_cache_dir() / f"{Path(METAHINTS_FILE).stem}-{digest}.marshal"
+    try:
+        # reading the file in one go is much faster than `marshal.load`
+        metamodel_hints = marshal.loads(cache_file.read_bytes())
+        if isinstance(metamodel_hints, dict):
+            return metamodel_hints
+    except Exception:  # pylint: disable=broad-except
+        # any unreadable cache is a cache miss
+        pass
+
+    metamodel_hints = json.loads(raw_hints)
+    write_cache_file(
+        cache_file,
+        lambda temp_file: temp_file.write_bytes(marshal.dumps(metamodel_hints)),
+        stale_pattern=f"{Path(METAHINTS_FILE).stem}-*",
+    )
+    return metamodel_hints
+
 
 @dataclass
 class MetaModel:
@@ -14,9 +110,14 @@ class MetaModel:
     derivation.
     """
 
-    metamodel_hints: dict[str, dict[str, dict[str, Any]]] = field(default_factory=dict)
+    metamodel_hints: Mapping[str, dict[str, dict[str, Any]]] = field(
+        default_factory=dict
+    )
+
+    pre_made_dicts: Mapping[str, dict[str, Any]] = field(default_factory=dict)
 
-    pre_made_dicts: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # the direct supertypes of each metaclass, as given in the Ecore metamodel
+    metaclass_supertypes: Mapping[str, list[str]] = field(default_factory=dict)
 
     # TODO: Refactor the functions definitions of these things into Class Variables
     relationship_metatypes: ClassVar[list[str]] = [
@@ -34,21 +135,47 @@ class MetaModel:
         "Subsetting",
     ]
 
-    def __init__(self):
-        self.pre_made_dicts = {}
-        self._load_metahints()
-        for metaclass in self.metamodel_hints:
-            self._load_template_data(metaclass_name=metaclass)
-
-    def _load_metahints(self):
+    # The metamodel used by all models that are not given one explicitly
+    shared_instance: ClassVar["MetaModel | None"] = None
+
+    def __init__(self, use_cache: bool = True):
+        self._load_metahints(use_cache=use_cache)
+        # the metamodel is shared between models, so only hand out read-only views
+        self.metamodel_hints = MappingProxyType(self.metamodel_hints)
+        self.pre_made_dicts = TemplateDicts(self)
+        self.metaclass_supertypes = MappingProxyType(
+            json.loads(
+                lib_resources.files("pymbe.static_data")
+                .joinpath(SUPERTYPES_FILE)
+                .read_text()
+            )
+        )
+        self._subtypes: dict[str, frozenset[str]] = {}
+
+    def _load_metahints(self, use_cache: bool = True):
         """Load data file to get attribute hints."""
-        with lib_resources.open_text(
-            "pymbe.static_data", "attribute_metadata.json"
-        ) as sysml_ecore:
-            self.metamodel_hints = json.load(sysml_ecore)
-
-    def _load_template_data(self, metaclass_name: str):
-        """Generate empty data dictionaries per metatype to be used when new
+        self.metamodel_hints = load_metahints(use_cache=use_cache)
+
+    def get_subtypes(self, metaclass_name: str) -> frozenset[str]:
+        """All the metaclasses that specialize a metaclass, including itself."""
+        subtypes = self._subtypes.get(metaclass_name)
+        if subtypes is None:
+            subtypes = frozenset(
+                name
+                for name in self.metaclass_supertypes
+                if self._is_subtype(name, metaclass_name)
+            ) | {metaclass_name}
+            self._subtypes[metaclass_name] = subtypes
+        return subtypes
+
+    def _is_subtype(self, metaclass_name: str, general_name: str) -> bool:
+        supertypes = self.metaclass_supertypes.get(metaclass_name, ())
+        return general_name in supertypes or any(
+            self._is_subtype(supertype, general_name) for supertype in supertypes
+        )
+
+    def _load_template_data(self, metaclass_name: str) -> dict[str, Any]:
+        """Generate an empty data dictionary for a metatype to be used when new
         elements are created by model modification functions.
 
         These templates resemble the raw JSON data pulled from the SysML
@@ -81,7 +208,80 @@ class MetaModel:
 
             data_template.update({att_name: starter_field})
 
-        self.pre_made_dicts.update({metaclass_name: data_template})
+        return data_template
+
+
+class TemplateDicts(Mapping):
+    """A read-only view of the element data templates that hands out a fresh
+    copy of the template on every lookup, so callers can fill it in without
+    corrupting the templates shared by every model.
+
+    Templates are only built the first time a metatype is requested. The
+    only mutable values in a template are empty lists, so a copy is a shallow
+    copy with fresh lists.
+    """
+
+    def __init__(self, metamodel: MetaModel):
+        self._metamodel = metamodel
+        self._templates: dict[str, tuple[Mapping[str, Any], tuple[str, ...]]] = {}
+
+    def __getitem__(self, metaclass_name: str) -> dict[str, Any]:
+        try:
+            template, list_fields = self._templates[metaclass_name]
+        except KeyError:
+            data_template = self._metamodel._load_template_data(metaclass_name)
+            template = MappingProxyType(data_template)
+            list_fields = tuple(
+                att_name
+                for att_name, starter_field in data_template.items()
+                if isinstance(starter_field, list)
+            )
+            self._templates[metaclass_name] = template, list_fields
+
+        new_data = dict(template)
+        for att_name in list_fields:
+            new_data[att_name] = []
+        return new_data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._metamodel.metamodel_hints)
+
+    def __len__(self) -> int:
+        return len(self._metamodel.metamodel_hints)
+
+
+def get_shared_metamodel() -> MetaModel:
+    """Return the process-wide metamodel, loading it the first time it is
+    needed.
+    """
+    if MetaModel.shared_instance is None:
+        with _shared_metamodel_lock:
+            if MetaModel.shared_instance is None:
+                MetaModel.shared_instance = MetaModel()
+    return MetaModel.shared_instance
+
+
+def set_shared_metamodel(metamodel: MetaModel | None):
+    """Replace the process-wide metamodel used by new models.
+
+    Passing `None` drops the current one, so the next model reloads it from
+    the static data.
+    """
+    with _shared_metamodel_lock:
+        MetaModel.shared_instance = metamodel
+
+
+@contextmanager
+def shared_metamodel_override(metamodel: MetaModel):
+    """Temporarily use a custom metamodel for every model created in the
+    block (e.g., in tests), restoring the previous one afterwards.
+    """
+    previous = MetaModel.shared_instance
+    set_shared_metamodel(metamodel)
+    try:
+        yield metamodel
+    finally:
+        set_shared_metamodel(previous)
 
 
 def list_relationship_metaclasses():
@@ -1,25 +1,73 @@
-import json
+import hashlib
 import logging
-from collections import defaultdict
-from collections.abc import Collection
+import marshal
+import os
+from collections import ChainMap, defaultdict
+from collections.abc import (
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+)
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from enum import Enum
-from functools import lru_cache
+from functools import wraps
+from itertools import repeat
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, ClassVar
 from uuid import uuid4
 from warnings import warn
 
+import pymbe
+from pymbe.attribute_index import AttributeIndex
+from pymbe.changes import ChangeKind, ModelChange
+from pymbe.merkle import MerkleTree, diff_models
 from pymbe.metamodel import (
     MetaModel,
     derive_attribute,
     derive_port_conjugation_source,
+    get_cache_dir,
+    get_metahints_digest,
+    get_shared_metamodel,
     list_relationship_metaclasses,
+    write_cache_file,
 )
+from pymbe.ownership import OWNER_KEYS, OwnershipIndex, get_owner_id
+from pymbe.qualified_names import QualifiedNameIndex
 from pymbe.query.metamodel_navigator import get_effective_basic_name
-
-OWNER_KEYS = ("owner", "owningRelatedElement", "owningRelationship")
+from pymbe.serialization import (
+    hash_files,
+    iter_element_data,
+    iter_ndjson_element_data,
+    merge_element_data,
+    open_element_data_file,
+    read_marshalled_element_data_file,
+    read_marshalled_ndjson_chunk,
+    split_ndjson_file,
+    write_element_data,
+    write_ndjson_element_data,
+)
+from pymbe.snapshot import SNAPSHOT_VERSION, SnapshotReader, write_snapshot
+
+if TYPE_CHECKING:
+    from pymbe.merkle import ModelDiff
+
+# the owned element collections of an overlay model, made when first used
+OVERLAY_COLLECTIONS = (
+    "all_relationships",
+    "all_non_relationships",
+    "ownedElement",
+    "ownedRelationship",
+    "ownedMetatype",
+)
 VALUE_METATYPES = ("AttributeDefinition", "AttributeUsage", "DataType")
+# an out of date ownership index is rebuilt after one query for every so many
+# of its elements, see `Model._get_ownership`
+STALE_OWNERSHIP_QUERIES = 16
 
 logger = logging.getLogger(__name__)
 
@@ -32,28 +80,320 @@ def is_id_item(item):
     )
 
 
-class ListOfNamedItems(list):
-    """A list that also can return items by their name."""
+def _forgets_indexes(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._forget_indexes()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class ElementList(list):
+    """A list of elements that can tell whether it holds an element without
+    going through all of its items.
+
+    The items are indexed the first time the list is checked for an element.
+    Adding items to the end of the list updates the index, and any other
+    change drops it.
+    """
+
+    __slots__ = ("_members",)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._members = None
+
+    def _forget_indexes(self):
+        self._members = None
+
+    # copies and unpickled lists make their own indexes, rather than sharing
+    # (or restoring) the ones of the original list
+    def __copy__(self):
+        return type(self)(self)
+
+    def __reduce_ex__(self, protocol):
+        return type(self), (list(self),)
+
+    def _remember(self, items):
+        members = self._members
+        if members is not None:
+            members.update(_member_keys(items))
+
+    def __contains__(self, item):
+        if not isinstance(item, Element):
+            return super().__contains__(item)
+        members = self._members
+        if members is None:
+            members = self._members = set(_member_keys(self))
+        # elements are equal to themselves and to their ids (see `Element.__eq__`)
+        return id(item) in members or item._id in members
+
+    def __iadd__(self, items):
+        items = list(items)
+        super().__iadd__(items)
+        self._remember(items)
+        return self
+
+    def append(self, item):
+        super().append(item)
+        self._remember((item,))
+
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        self._remember(items)
+
+    __setitem__ = _forgets_indexes(list.__setitem__)
+    __delitem__ = _forgets_indexes(list.__delitem__)
+    __imul__ = _forgets_indexes(list.__imul__)
+    insert = _forgets_indexes(list.insert)
+    pop = _forgets_indexes(list.pop)
+    remove = _forgets_indexes(list.remove)
+    clear = _forgets_indexes(list.clear)
+
+
+def _member_keys(items: Iterable) -> Iterator:
+    """The keys an element in a list can be matched with: other elements by
+    identity, and ids by value.
+    """
+    for item in items:
+        if isinstance(item, Element):
+            yield id(item)
+        elif isinstance(item, str):
+            yield item
+
+
+class ListOfNamedItems(ElementList):
+    """A list that also can return items by their name.
+
+    The items are indexed by name the first time they are looked up by name,
+    and the index is dropped whenever the list changes. The index remembers
+    the revisions of the models of its items, so a name that is not found is
+    only looked up again after an item is renamed with `Element.set` (or the
+    models otherwise change). The name of an indexed item is checked when it
+    is found, in case it was renamed in place.
+    """
+
+    __slots__ = ("_name_index", "_name_index_revisions")
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._name_index = None
+        self._name_index_revisions = ()
+
+    def _forget_indexes(self):
+        super()._forget_indexes()
+        self._name_index = None
+
+    def _remember(self, items):
+        super()._remember(items)
+        self._name_index = None
+
+    def _build_name_index(self) -> dict[str, "Element"]:
+        named_items = [item for item in self if isinstance(item, Element)]
+        # declared names take precedence over effective names
+        name_index = {
+            item._data["effectiveName"]: item
+            for item in named_items
+            if "effectiveName" in item._data
+        }
+        name_index.update(
+            (item._data["declaredName"], item)
+            for item in named_items
+            if "declaredName" in item._data
+        )
+        models = {id(item._model): item._model for item in named_items if item._model}
+        self._name_index = name_index
+        self._name_index_revisions = tuple(
+            (model, model._revision) for model in models.values()
+        )
+        return name_index
+
+    def _is_name_index_current(self) -> bool:
+        return all(
+            model._revision == revision
+            for model, revision in self._name_index_revisions
+        )
 
     # FIXME: figure out why __dir__ of returned objects think they are lists
     def __getitem__(self, key):
-        item_map = {
-            item._data["declaredName"]: item
-            for item in self
-            if isinstance(item, Element) and "declaredName" in item._data
-        }
-        effective_item_map = {
-            item._data["effectiveName"]: item
-            for item in self
-            if isinstance(item, Element) and "effectiveName" in item._data
-        }
-        if key in item_map:
-            return item_map[key]
-        if key in effective_item_map:
-            return effective_item_map[key]
         if isinstance(key, int):
             return super().__getitem__(key)
-        return None
+        name_index = self._name_index
+        if name_index is None:
+            name_index = self._build_name_index()
+        else:
+            item = name_index.get(key)
+            if item is None:
+                if self._is_name_index_current():
+                    return None
+            elif key in (
+                item._data.get("declaredName"),
+                item._data.get("effectiveName"),
+            ):
+                return item
+            name_index = self._build_name_index()
+        return name_index.get(key)
+
+    # the order of the items decides which one is found for a repeated name
+    reverse = _forgets_indexes(list.reverse)
+    sort = _forgets_indexes(list.sort)
+
+
+class LazyElements(dict):
+    """A dictionary of elements by id whose values are only turned into
+    `Element` objects the first time they are accessed.
+
+    Values that have not been accessed yet are stored as-is (e.g., the raw
+    element data) and passed to `materialize` along with their key. If they
+    are not the element data, `read_data` gets it from them the same way.
+    """
+
+    def __init__(
+        self,
+        items,
+        materialize: Callable[[str, Any], "Element"],
+        read_data: Callable[[str, Any], dict] | None = None,
+    ):
+        super().__init__(items)
+        self._materialize = materialize
+        self._read_data = read_data
+
+    def __iter__(self):
+        # overriding this stops `dict(...)` and `{**...}` from copying the raw values
+        return super().__iter__()
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, Element):
+            return value
+        element = self._materialize(key, value)
+        super().__setitem__(key, element)
+        return element
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        if key in self:
+            element = self[key]
+            super().pop(key)
+            return element
+        return super().pop(key, *default)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def copy(self):
+        return dict(self.items())
+
+    def iter_data(self) -> Iterator[dict]:
+        """The data of the elements, without making the elements that have
+        not been accessed yet.
+        """
+        read_data = self._read_data
+        for key, value in dict.items(self):
+            if isinstance(value, Element):
+                yield value._data
+            elif read_data is None:
+                yield value
+            else:
+                yield read_data(key, value)
+
+    def __repr__(self) -> str:
+        return f"<{len(self)} lazily loaded elements>"
+
+
+class LazyElementLists(dict):
+    """A dictionary of lists of element ids that are turned into lists of
+    `Element` objects the first time they are accessed.
+    """
+
+    def __init__(self, items, model: "Model"):
+        super().__init__(items)
+        self._model = model
+        self._pending = set(self)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if key in self._pending:
+            elements = self._model.elements
+            value = ElementList(elements[id_] for id_ in value)
+            super().__setitem__(key, value)
+            self._pending.discard(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._pending.discard(key)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+
+class OverlayElements(MutableMapping):
+    """The elements of an overlay model: the elements added to the overlay,
+    over those of its base model.
+
+    The elements of the base are passed to `make_view` the first time they
+    are accessed, to make the overlay's own `Element` for them.
+    """
+
+    def __init__(self, base: Mapping[str, "Element"], make_view: Callable):
+        self._base = base
+        self._make_view = make_view
+        self._own: dict[str, Element] = {}
+        self._added: dict[str, None] = {}  # the ids that are not in the base
+
+    def __getitem__(self, key):
+        own = self._own
+        element = own.get(key)
+        if element is None:
+            element = own[key] = self._make_view(self._base[key])
+        return element
+
+    def __setitem__(self, key, value):
+        if key not in self._own and key not in self._base:
+            self._added[key] = None
+        self._own[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._added:
+            raise KeyError(f"Cannot remove '{key}', it is not an added element")
+        del self._added[key]
+        del self._own[key]
+
+    def __contains__(self, key):
+        return key in self._own or key in self._base
+
+    def __iter__(self):
+        yield from self._base
+        yield from self._added
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._added)
+
+    def __repr__(self) -> str:
+        return f"<{len(self._added)} elements added over {len(self._base)}>"
 
 
 class Naming(Enum):
@@ -102,6 +442,21 @@ class ModelClient:
         raise NotImplementedError("Must be implemented by the subclass")
 
 
+@dataclass
+class StagedChanges:
+    """The changes made to a model in a `Model.batch`, applied when it ends."""
+
+    # the new elements, with whether each had no owner when it was added
+    elements: list[tuple["Element", bool]] = field(default_factory=list)
+    relationships: list["Element"] = field(default_factory=list)
+    # the items appended to the list attributes of elements, e.g., to the
+    # `ownedRelationship` of the owners of new elements
+    appends: list[tuple["Element", str, Any]] = field(default_factory=list)
+    changes: list[tuple[ChangeKind, "Element", str | None]] = field(
+        default_factory=list
+    )
+
+
 @dataclass(repr=False)
 class Model:  # pylint: disable=too-many-instance-attributes
     """A SysML v2 Model."""
@@ -117,11 +472,11 @@ class Model:  # pylint: disable=too-many-instance-attributes
     ownedElement: ListOfNamedItems = field(  # pylint: disable=invalid-name
         default_factory=ListOfNamedItems,
     )
-    ownedMetatype: dict[str, list["Element"]] = field(  # pylint: disable=invalid-name
+    ownedMetatype: dict[str, ElementList] = field(  # pylint: disable=invalid-name
         default_factory=dict,
     )
-    ownedRelationship: list["Element"] = field(  # pylint: disable=invalid-name
-        default_factory=list,
+    ownedRelationship: ElementList = field(  # pylint: disable=invalid-name
+        default_factory=ElementList,
     )
 
     max_multiplicity = 10
@@ -130,21 +485,46 @@ class Model:  # pylint: disable=too-many-instance-attributes
 
     _api: ModelClient = None
     _initializing: bool = True
+    _owns_data: bool = False  # Whether the element data was made for this model
+    _read_only: bool = False  # Whether the model is shared and cannot be changed
+    _ownership: Any = None  # The OwnershipIndex, see `Model.ownership`
+    _ownership_is_stale: bool = False  # Whether elements moved since it was built
+    _stale_ownership_queries: int = 0  # Answered without it, see `_get_ownership`
+    _qualified_names: Any = None  # The QualifiedNameIndex, see `Model.qualified_names`
+    _attribute_index: Any = None  # The AttributeIndex, see `Model.find`
+    _merkle_tree: Any = None  # The MerkleTree, see `Model.merkle_tree`
+    _merkle_tree_revision: int = -1  # The revision the MerkleTree was built at
+    _revision: int = 0  # Bumped by every change, see `Model.revision`
+    _subscribers: list[Callable[[ModelChange], None]] = field(default_factory=list)
+    _lazy: bool = False  # Only make Element objects when they are first accessed
+    _relationships_by_end: dict[str, list[str]] = field(default_factory=dict)
+    _snapshot: Any = None  # The SnapshotReader, for models opened from a snapshot
+    _batch_depth: int = 0  # How many `Model.batch` blocks are open
+    _staged: StagedChanges = field(default_factory=StagedChanges)  # See `Model.batch`
     _naming: Naming = Naming.LABEL  # The scheme to use for retrieving element names
     _labeling: Naming = Naming.LABEL  # The scheme to use for repr'ing the elements
+    _base: "Model" = field(default=None, compare=False)  # The base of an overlay model
+    _shared_ids: set[str] = field(default_factory=set)  # Overlay elements sharing data
 
+    # If not given, the process-wide metamodel is shared by all models
     metamodel: MetaModel = None
 
+    # The read-only KerML library shared by all models, see `get_shared_library`
+    shared_library: ClassVar["Model | None"] = None
+
     _referenced_models: list["Model"] = field(  # pylint: disable=invalid-name
         default_factory=list,
     )
+    # The referenced model holding each element id, see `reference_other_model`
+    _model_index: dict[str, "Model"] = field(default_factory=dict, compare=False)
 
     _metamodel_hints: dict[str, list[list[str]]] = field(
         default_factory=dict
     )  # hints about attribute primary v derived, expected value type, etc.
 
     def __post_init__(self):
-        self.metamodel = MetaModel()
+        if self.metamodel is None:
+            self.metamodel = get_shared_metamodel()
 
         self._metamodel_hints = self.metamodel.metamodel_hints
 
@@ -161,9 +541,34 @@ class Model:  # pylint: disable=too-many-instance-attributes
         #     if isinstance(data, dict)
         # }
 
+        if self._snapshot is not None:
+            self._add_owned_from_snapshot()
+            self._initializing = False
+            return
+
+        if self._base is not None:
+            self._init_overlay()
+            self._initializing = False
+            return
+
+        if self._lazy:
+            self.elements = LazyElements(
+                (
+                    (id_, data)
+                    for id_, data in self.elements.items()
+                    if isinstance(data, dict)
+                ),
+                materialize=self._materialize_element,
+            )
+            self._index_relationship_ends()
+            self._add_owned_lazily()
+            self._initializing = False
+            return
+
         self.elements = {
             id_: Element(
-                _data={**data, "@id": id_},
+                _id=id_,
+                _data=data if self._owns_data else {**data, "@id": id_},
                 _model=self,
                 _metamodel_hints=self._metamodel_hints[data["@type"]],
             )
@@ -183,13 +588,30 @@ class Model:  # pylint: disable=too-many-instance-attributes
         data = self.source or f"{len(self.elements)} elements"
         return f"<SysML v2 Model ({data})>"
 
+    def __getattr__(self, key: str):
+        # the owned element collections of an overlay are made when first used
+        if key in OVERLAY_COLLECTIONS and self.__dict__.get("_base") is not None:
+            self._add_owned_from_base()
+            return getattr(self, key)
+        raise AttributeError(f"'Model' object has no attribute '{key}'")
+
     @staticmethod
     def load(
-        elements: Collection[dict],
+        elements: Iterable[dict],
+        lazy: bool = False,
         **kwargs,
     ) -> "Model":
-        """Make a Model from an iterable container of elements."""
+        """Make a Model from an iterable of elements.
+
+        The elements are consumed one at a time, so they can be streamed
+        (e.g., from `iter_element_data`).
+
+        If `lazy` is True, the `Element` objects (and their derived
+        relationships) are only made when they are first accessed, which
+        saves time when only a small part of a large model is used.
+        """
         return Model(
+            _lazy=lazy,
             elements={
                 element.get("identity", element).get("@id"): element.get(
                     "payload", element
@@ -200,24 +622,46 @@ class Model:  # pylint: disable=too-many-instance-attributes
         )
 
     @staticmethod
-    def load_from_file(filepath: Path | str, encoding: str = "utf-8") -> "Model":
-        """Make a model from a JSON file."""
+    def load_from_file(
+        filepath: Path | str,
+        encoding: str = "utf-8",
+        stream: bool = False,
+        lazy: bool = False,
+    ) -> "Model":
+        """Make a model from a JSON file.
+
+        Use `stream=True` to decode very large files one element at a time,
+        and `lazy=True` to only make the elements when they are used (see
+        `Model.load`).
+        """
         if isinstance(filepath, str):
             filepath = Path(filepath)
 
         if not filepath.is_file():
             raise ValueError(f"'{filepath}' does not exist!")
 
-        return Model.load(
-            elements=json.loads(filepath.read_text(encoding=encoding)),
-            name=filepath.name,
-            source=filepath.resolve(),
-        )
+        with open_element_data_file(filepath, encoding=encoding) as raw_fp:
+            return Model.load(
+                elements=iter_element_data(raw_fp, stream=stream),
+                name=filepath.name,
+                source=filepath.resolve(),
+                lazy=lazy,
+                _owns_data=True,
+            )
 
     @staticmethod
-    def load_from_post_file(filepath: Path | str, encoding: str = "utf-8") -> "Model":
+    def load_from_post_file(
+        filepath: Path | str,
+        encoding: str = "utf-8",
+        stream: bool = False,
+        lazy: bool = False,
+    ) -> "Model":
         """Make a model from a JSON file formatted to POST to v2 API (includes
         payload fields)
+
+        Use `stream=True` to decode very large files one element at a time,
+        and `lazy=True` to only make the elements when they are used (see
+        `Model.load`).
         """
         if isinstance(filepath, str):
             filepath = Path(filepath)
@@ -225,60 +669,302 @@ class Model:  # pylint: disable=too-many-instance-attributes
         if not filepath.is_file():
             raise ValueError(f"'{filepath}' does not exist!")
 
-        with open(filepath, encoding="UTF-8") as raw_post_fp:
-            element_raw_post_data = json.load(raw_post_fp)
-
-            factored_data = []
-            for raw_post in element_raw_post_data:
-                factored_data_element = dict(raw_post["payload"].items()) | {
-                    "@id": raw_post["identity"]["@id"]
-                }
-                factored_data.append(factored_data_element)
-
-        return Model.load(
-            elements=factored_data,
-            name=filepath.name,
-            source=filepath.resolve(),
-        )
+        with open_element_data_file(filepath, encoding=encoding) as raw_post_fp:
+            return Model.load(
+                elements=iter_element_data(raw_post_fp, stream=stream),
+                name=filepath.name,
+                source=filepath.resolve(),
+                lazy=lazy,
+                _owns_data=True,
+            )
 
     @staticmethod
     def load_from_mult_post_files(
-        filepath_list: list, encoding: str = "utf-8"
+        filepath_list: list,
+        encoding: str = "utf-8",
+        stream: bool = False,
+        *,
+        parallel: bool = False,
+        max_workers: int | None = None,
+        lazy: bool = False,
     ) -> "Model":
         """Make a model from multiple JSON files formatted to POST to v2 API
         (includes payload fields)
+
+        Use `stream=True` to decode very large files one element at a time,
+        and `parallel=True` to decode the files concurrently in a pool of (at
+        most `max_workers`) processes. Elements found in more than one file
+        are reported in a warning. Use `lazy=True` to only make the elements
+        when they are used (see `Model.load`).
         """
-        factored_data = []
+        filepath_list = [Path(filepath) for filepath in filepath_list]
 
         for filepath in filepath_list:
-            if isinstance(filepath, str):
-                filepath = Path(filepath)
-
             if not filepath.is_file():
                 raise ValueError(f"'{filepath}' does not exist!")
 
-            with open(filepath, encoding="UTF-8") as raw_post_fp:
-                element_raw_post_data = json.load(raw_post_fp)
+        # share the references between all the files
+        references = {}
 
-                for raw_post in element_raw_post_data:
-                    factored_data_element = dict(raw_post["payload"].items()) | {
-                        "@id": raw_post["identity"]["@id"]
-                    }
-                    factored_data.append(factored_data_element)
+        def iter_file_element_data(filepath: Path):
+            with open_element_data_file(filepath, encoding=encoding) as raw_post_fp:
+                yield from iter_element_data(
+                    raw_post_fp, stream=stream, references=references
+                )
+
+        if parallel:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                marshalled_data = list(
+                    pool.map(
+                        read_marshalled_element_data_file,
+                        filepath_list,
+                        repeat(encoding),
+                        repeat(stream),
+                    )
+                )
+            elements = merge_element_data(
+                zip(filepath_list, map(marshal.loads, marshalled_data))
+            )
+        else:
+            elements = merge_element_data(
+                (filepath, iter_file_element_data(filepath))
+                for filepath in filepath_list
+            )
 
         return Model.load(
-            elements=factored_data,
-            name=filepath.name,
+            elements=elements.values(),
+            name=filepath_list[-1].name,
             source=filepath_list[0].resolve(),
+            lazy=lazy,
+            _owns_data=True,
+        )
+
+    @staticmethod
+    def load_from_ndjson_file(
+        filepath: Path | str,
+        encoding: str = "utf-8",
+        *,
+        lazy: bool = False,
+        parallel: bool = False,
+        max_workers: int | None = None,
+    ) -> "Model":
+        """Make a model from a newline-delimited JSON file, with one element
+        (in either the plain or the POST format) per line.
+
+        An element found in more than one line is taken from the last one, so
+        elements can be updated by appending them to the file, and several
+        exports can be concatenated into one file.
+
+        Use `parallel=True` to decode chunks of the file concurrently in a pool
+        of (at most `max_workers`) processes. Files compressed with gzip are
+        always decoded in one go. Use `lazy=True` to only make the elements
+        when they are used (see `Model.load`).
+        """
+        if isinstance(filepath, str):
+            filepath = Path(filepath)
+
+        if not filepath.is_file():
+            raise ValueError(f"'{filepath}' does not exist!")
+
+        kwargs = dict(
+            name=filepath.name,
+            source=filepath.resolve(),
+            lazy=lazy,
+            _owns_data=True,
+        )
+        if not parallel or filepath.suffix == ".gz":
+            with open_element_data_file(filepath, encoding=encoding) as raw_fp:
+                return Model.load(elements=iter_ndjson_element_data(raw_fp), **kwargs)
+
+        chunks = split_ndjson_file(filepath, max_workers or os.cpu_count() or 1)
+        if not chunks:
+            return Model.load(elements=(), **kwargs)
+        starts, ends = zip(*chunks)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            marshalled_data = list(
+                pool.map(
+                    read_marshalled_ndjson_chunk,
+                    [filepath] * len(chunks),
+                    starts,
+                    ends,
+                    [encoding] * len(chunks),
+                )
+            )
+        return Model.load(
+            elements=(
+                data for chunk in marshalled_data for data in marshal.loads(chunk)
+            ),
+            **kwargs,
         )
 
     @property
-    def packages(self) -> tuple["Element", ...]:
-        return tuple(
-            element
-            for element in self.elements.values()
-            if element._metatype == "Package"
+    def ownership(self) -> "OwnershipIndex":
+        """An index of the ownership tree of the elements, to tell whether an
+        element is under another and get all the elements under one, built
+        on first use and rebuilt after elements are added or change owner.
+        """
+        if self._ownership is None or self._ownership_is_stale:
+            self._ownership = OwnershipIndex.from_model(self)
+            self._ownership_is_stale = False
+            self._stale_ownership_queries = 0
+        return self._ownership
+
+    def _get_ownership(self) -> "OwnershipIndex | None":
+        """The ownership index for a query about a few elements, or None if
+        elements were added or moved since it was built, and the query should
+        walk up their owners instead.
+
+        Rebuilding the index costs as much as many walks, so it is only
+        rebuilt once enough queries were made without it, rather than after
+        every change when changes and queries alternate (e.g., when building
+        a model).
+        """
+        if self._ownership_is_stale:
+            self._stale_ownership_queries += 1
+            queries_per_rebuild = len(self._ownership.ids) // STALE_OWNERSHIP_QUERIES
+            if self._stale_ownership_queries <= queries_per_rebuild:
+                return None
+        return self.ownership
+
+    @property
+    def merkle_tree(self) -> "MerkleTree":
+        """The hashes of the content of the elements and of the subtrees of
+        the ownership tree, built on first use and rebuilt after the model
+        changes.
+        """
+        if self._merkle_tree is None or self._merkle_tree_revision != self._revision:
+            self._merkle_tree = MerkleTree.from_model(self)
+            self._merkle_tree_revision = self._revision
+        return self._merkle_tree
+
+    def diff(self, other: "Model") -> "ModelDiff":
+        """The elements and relationships added, removed and modified from
+        this model to another, e.g., the same model at a later commit.
+
+        Only the subtrees of the ownership tree whose Merkle hashes differ
+        are compared (see `merkle_tree`).
+        """
+        return diff_models(self, other)
+
+    @property
+    def qualified_names(self) -> "QualifiedNameIndex":
+        """A trie of the qualified names of the elements, built on first use
+        and kept up to date as elements are added, renamed or moved.
+        """
+        if self._qualified_names is None:
+            self._qualified_names = QualifiedNameIndex(self)
+        return self._qualified_names
+
+    def get_elements_by_qualified_name(self, qualified_name: str) -> list["Element"]:
+        """The elements with a qualified name, e.g., `Vehicles::Car::wheels`."""
+        elements = self.elements
+        return [elements[id_] for id_ in self.qualified_names.get(qualified_name)]
+
+    @property
+    def attribute_index(self) -> "AttributeIndex":
+        """Secondary indexes of the elements by attribute value, each made the
+        first time the attribute is queried and kept up to date afterwards.
+        """
+        if self._attribute_index is None:
+            self._attribute_index = AttributeIndex(self)
+        return self._attribute_index
+
+    def find(
+        self, metatype: str = None, include_subtypes: bool = True, **attr_predicates
+    ) -> list["Element"]:
+        """Find the elements of a metatype whose attributes match, e.g.,
+        `model.find("PartDefinition", isAbstract=True)`.
+
+        With `include_subtypes`, elements of the metatypes that specialize the
+        given one are found too. Attributes given a hashable value are looked
+        up in the `attribute_index` (as is the metatype), so repeated queries
+        do not scan the model, while those given a callable are filtered by
+        calling it with the attribute value of each element found.
+        """
+        index = self.attribute_index
+        candidates = []
+        if metatype is not None:
+            metatypes = (
+                self.metamodel.get_subtypes(metatype)
+                if include_subtypes
+                else (metatype,)
+            )
+            candidates.append(
+                {
+                    id_: None
+                    for name in metatypes
+                    for id_ in index.get_ids("@type", name)
+                }
+            )
+        predicates = {}
+        for attribute, value in attr_predicates.items():
+            if callable(value) or not isinstance(value, Hashable):
+                predicates[attribute] = value
+            else:
+                candidates.append(index.get_ids(attribute, value))
+
+        elements = self.elements
+        if candidates:
+            candidates.sort(key=len)
+            ids = [
+                id_
+                for id_ in candidates[0]
+                if all(id_ in other_ids for other_ids in candidates[1:])
+            ]
+            found = [elements[id_] for id_ in ids]
+        else:
+            found = list(elements.values())
+
+        for attribute, predicate in predicates.items():
+            found = [
+                element
+                for element in found
+                if attribute in element._data
+                and (
+                    predicate(element._data[attribute])
+                    if callable(predicate)
+                    else element._data[attribute] == predicate
+                )
+            ]
+        return found
+
+    @property
+    def revision(self) -> int:
+        """A number that grows with every change made to the model, to tell
+        whether something computed from the model may be out of date.
+        """
+        return self._revision
+
+    def subscribe(self, callback: Callable[[ModelChange], None]) -> Callable[[], None]:
+        """Call `callback` with a `ModelChange` for every change made to the
+        model, and return a function that unsubscribes it.
+        """
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _notify(self, kind: ChangeKind, element: "Element", attribute: str = None):
+        if self._batch_depth:
+            self._staged.changes.append((kind, element, attribute))
+            return
+        self._revision += 1
+        if kind is ChangeKind.ELEMENT_ADDED or attribute in OWNER_KEYS:
+            self._ownership_is_stale = self._ownership is not None
+        if not self._subscribers:
+            return
+        change = ModelChange(
+            kind=kind, element=element, revision=self._revision, attribute=attribute
         )
+        for callback in tuple(self._subscribers):
+            callback(change)
+
+    @property
+    def packages(self) -> tuple["Element", ...]:
+        return tuple(self.ownedMetatype.get("Package", ()))
 
     def get_element(
         self, element_id: str, fail: bool = True, resolve: bool = True
@@ -298,28 +984,143 @@ class Model:  # pylint: disable=too-many-instance-attributes
         if element and resolve and element._is_proxy:
             element.resolve()
         if fail and element is None:
-            # hacky way to use library references, need more scaleable version
+            ref_model = self._model_index.get(element_id)
+            if ref_model is not None:
+                return ref_model.get_element(element_id)
+            # the element may have been added to a referenced model after it was indexed
             for ref_model in self._referenced_models:
                 try:
                     element = ref_model.get_element(element_id)
-                    return element
                 except KeyError:
-                    pass
+                    continue
+                self._model_index[element_id] = element._model
+                return element
             raise KeyError(f"Could not retrieve '{element_id}' from the API")
         return element
 
+    @contextmanager
+    def batch(self):
+        """Stage the changes made to the model, e.g., by the model modification
+        builders, and apply them in one pass when the outermost batch ends.
+
+        Inside a batch, the new elements can already be retrieved and their
+        data is set, but the following are staged until the batch ends:
+        - adding the new elements to `ownedElement`, `ownedMetatype`,
+          `ownedRelationship` and `all_relationships`,
+        - navigating the new relationships from their ends (e.g.,
+          `throughSubclassification`),
+        - appending the new relationships to the `ownedRelationship` of
+          their owners, and
+        - letting the model's subscribers know about the changes, which they
+          are then given in the order they were made, with a single new
+          revision of the model.
+
+        The staged changes are applied even if the block raises, since the
+        changes to the element data cannot be undone.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._commit_staged_changes()
+
+    def _commit_staged_changes(self):
+        staged, self._staged = self._staged, StagedChanges()
+        for element, key, item in staged.appends:
+            element._data[key].append(item)
+        unlinked = {
+            id(relationship)
+            for relationship in staged.relationships
+            if not self._link_relationship(relationship)
+        }
+        for element, is_unowned in staged.elements:
+            self._add_to_owned(element, is_unowned)
+
+        changes = [
+            (kind, element, attribute)
+            for kind, element, attribute in staged.changes
+            if kind is not ChangeKind.RELATIONSHIP_ADDED or id(element) not in unlinked
+        ]
+        if not changes:
+            return
+        self._revision += 1
+        if any(
+            kind is ChangeKind.ELEMENT_ADDED or attribute in OWNER_KEYS
+            for kind, _, attribute in changes
+        ):
+            self._ownership_is_stale = self._ownership is not None
+        for callback in tuple(self._subscribers):
+            for kind, element, attribute in changes:
+                callback(
+                    ModelChange(
+                        kind=kind,
+                        element=element,
+                        revision=self._revision,
+                        attribute=attribute,
+                    )
+                )
+
     def _add_element(self, element: "Element") -> "Element":
+        self._check_writable()
+        self.elements[element._id] = element
+        self._notify(ChangeKind.ELEMENT_ADDED, element)
+        if self._batch_depth:
+            self._staged.elements.append((element, element.get_owner() is None))
+            return element
+        self._add_to_owned(element)
+
+        # if not self._initializing:
+        #    self._add_labels(element)
+        return element
+
+    def _append_to(self, element: "Element", key: str, item: Any):
+        """Append an item to a list attribute of an element (e.g., a new
+        relationship to the `ownedRelationship` of its owner), when the batch
+        ends if in one.
+        """
+        element._model._prepare_change(element)
+        if self._batch_depth:
+            self._staged.appends.append((element, key, item))
+        else:
+            element._data[key].append(item)
+        self._notify(ChangeKind.ATTRIBUTE_SET, element, attribute=key)
+
+    def _check_writable(self):
+        if self._read_only:
+            raise ValueError(f"Model '{self.name}' is read-only and cannot be changed")
+
+    def _prepare_change(self, element: "Element"):
+        """Check that an element of this model can be changed, and give it its
+        own copy of the data it shares with the base of an overlay model.
+        """
+        self._check_writable()
+        if element._id not in self._shared_ids:
+            return
+        self._shared_ids.discard(element._id)
+        element._data = {
+            key: type(value)(value) if isinstance(value, list) else value
+            for key, value in element._data.items()
+        }
+        derived = defaultdict(list)
+        for key, value in element._derived.items():
+            derived[key] = list(value) if isinstance(value, list) else value
+        element._derived = derived
+        element._package = None
+
+    def _add_to_owned(self, element: "Element", is_unowned: bool = None):
         id_ = element._id
         metatype = element._metatype
 
-        self.elements[id_] = element
-
-        if element.get_owner() is None:
+        if is_unowned is None:
+            is_unowned = element.get_owner() is None
+        if is_unowned:
             if element not in self.ownedElement:
                 self.ownedElement += [element]
 
         if metatype not in self.ownedMetatype:
-            self.ownedMetatype[metatype] = []
+            self.ownedMetatype[metatype] = ElementList()
         if element not in self.ownedMetatype[metatype]:
             self.ownedMetatype[metatype] += [element]
 
@@ -331,33 +1132,250 @@ class Model:  # pylint: disable=too-many-instance-attributes
         elif id_ not in self.all_non_relationships:
             self.all_non_relationships[id_] = element
 
-        # if not self._initializing:
-        #    self._add_labels(element)
-        return element
-
     def save_to_file(
         self,
         filepath: Path | str = None,
         indent: int = 2,
         encoding: str = "utf-8",
+        compress: bool = False,
+        post_format: bool = False,
     ):
-        filepath = filepath or self.name
+        """Save the model to a JSON file, writing one element at a time.
+
+        Use `compress=True` to compress the file with gzip (adding a `.gz`
+        suffix), and `post_format=True` to format the elements to POST to
+        the v2 API (with `identity` and `payload` fields).
+        """
         if not self.elements:
             warn("Model has no elements, nothing to save!")
             return
+        filepath = self._get_save_path(filepath, ".json", compress)
+        if filepath.exists():
+            warn(f"Overwriting {filepath}")
+        with open_element_data_file(filepath, "w", encoding=encoding) as raw_fp:
+            write_element_data(
+                raw_fp,
+                self._iter_element_data(),
+                indent=indent,
+                post_format=post_format,
+            )
+
+    def save_to_ndjson_file(
+        self,
+        filepath: Path | str = None,
+        encoding: str = "utf-8",
+        compress: bool = False,
+        post_format: bool = False,
+        *,
+        append: bool = False,
+        elements: Iterable["Element"] | None = None,
+    ):
+        """Save the model to a newline-delimited JSON file, with one element
+        per line.
+
+        Use `append=True` to add the elements to the end of the file instead
+        of overwriting it, and `elements` to only save some of the elements
+        (e.g., those that changed). `compress` and `post_format` are the same
+        as for `save_to_file`.
+        """
+        filepath = self._get_save_path(filepath, ".ndjson", compress)
+        if not append and filepath.exists():
+            warn(f"Overwriting {filepath}")
+        mode = "a" if append else "w"
+        with open_element_data_file(filepath, mode, encoding=encoding) as raw_fp:
+            write_ndjson_element_data(
+                raw_fp,
+                (
+                    self._iter_element_data()
+                    if elements is None
+                    else (element._data for element in elements)
+                ),
+                post_format=post_format,
+            )
+
+    def _iter_element_data(self) -> Iterator[dict]:
+        """The data of the elements, without making the elements of lazily
+        loaded models (see `LazyElements.iter_data`).
+        """
+        if isinstance(self.elements, LazyElements):
+            return self.elements.iter_data()
+        return (element._data for element in self.elements.values())
+
+    def _get_save_path(self, filepath: Path | str, suffix: str, compress: bool) -> Path:
+        filepath = Path(filepath or self.name)
+        if not filepath.name.endswith((suffix, f"{suffix}.gz")):
+            filepath = filepath.parent / f"{filepath.name}{suffix}"
+        if compress and filepath.suffix != ".gz":
+            filepath = filepath.parent / f"{filepath.name}.gz"
+        return filepath
+
+    def save_snapshot(self, filepath: Path | str):
+        """Save the model to a binary snapshot, which `Model.open_snapshot`
+        can open without decoding all of its elements.
+
+        Snapshots can only be opened by the Python version that saved them,
+        and do not include the referenced (e.g., library) models.
+        """
         if isinstance(filepath, str):
             filepath = Path(filepath)
-        if not filepath.name.endswith(".json"):
-            filepath = filepath.parent / f"{filepath.name}.json"
         if filepath.exists():
             warn(f"Overwriting {filepath}")
-        filepath.write_text(
-            json.dumps(
-                [element._data for element in self.elements.values()],
-                indent=indent,
-            ),
-            encoding=encoding,
+        write_snapshot(filepath, self)
+
+    @staticmethod
+    def open_snapshot(filepath: Path | str) -> "Model":
+        """Open a model saved with `Model.save_snapshot`.
+
+        The snapshot is memory-mapped, and the elements are only decoded
+        when they are first accessed, like those of a lazily loaded model.
+        """
+        if isinstance(filepath, str):
+            filepath = Path(filepath)
+
+        if not filepath.is_file():
+            raise ValueError(f"'{filepath}' does not exist!")
+
+        snapshot = SnapshotReader(filepath)
+        return Model(
+            elements={},
+            name=snapshot.info["name"],
+            source=Path(snapshot.info["source"]) if snapshot.info["source"] else None,
+            _lazy=True,
+            _owns_data=True,
+            _snapshot=snapshot,
+        )
+
+    @staticmethod
+    def load_cached(
+        source: Path | str | list[Path | str],
+        encoding: str = "utf-8",
+    ) -> "Model":
+        """Make a model from one or more JSON files (in the plain or POST
+        format), and keep a snapshot of the built model, with its derived
+        relationships, owned element collections and labels, in the cache
+        directory (see `get_cache_dir`).
+
+        The snapshot is named after the paths of the files, and keyed by the
+        hash of their contents, the versions of pymbe and of the snapshot
+        format, and the attribute hints. When none of them changed, the model
+        is opened from the snapshot (see `Model.open_snapshot`) instead of
+        being built again, and otherwise the snapshot is replaced.
+        """
+        if isinstance(source, (str, Path)):
+            source = [source]
+        filepaths = [Path(filepath) for filepath in source]
+        for filepath in filepaths:
+            if not filepath.is_file():
+                raise ValueError(f"'{filepath}' does not exist!")
+
+        paths_digest = hashlib.sha256(
+            "\0".join(str(filepath.resolve()) for filepath in filepaths).encode()
+        ).hexdigest()[:16]
+        key = "\0".join(
+            (
+                hash_files(filepaths),
+                pymbe.__version__,
+                str(SNAPSHOT_VERSION),
+                get_metahints_digest(),
+            )
+        )
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        name = f"{filepaths[0].stem}-{paths_digest}"
+        cache_file = get_cache_dir() / "models" / f"{name}-{digest}.snapshot"
+        try:
+            return Model.open_snapshot(cache_file)
+        except (OSError, ValueError, EOFError):
+            pass
+
+        if len(filepaths) == 1:
+            model = Model.load_from_file(filepaths[0], encoding=encoding)
+        else:
+            model = Model.load_from_mult_post_files(filepaths, encoding=encoding)
+        model._add_labels()
+        # the snapshots of older versions of the same files are no longer needed
+        write_cache_file(
+            cache_file,
+            lambda temp_file: write_snapshot(temp_file, model),
+            stale_pattern=f"{name}-{'?' * len(digest)}.snapshot",
         )
+        return model
+
+    def overlay(self, name: str | None = None) -> "Model":
+        """Make a model that layers new and changed elements over this one,
+        e.g., to try out changes without loading the model again.
+
+        Making an overlay takes the same time however big this model is. The
+        overlay's elements share their data with this model's elements until
+        they are changed, when only the changed ones are copied. This model
+        becomes read-only, so all of its overlays keep the same base, and
+        discarding an overlay leaves nothing to undo.
+        """
+        self._read_only = True
+        return Model(
+            elements={},
+            name=name or self.name,
+            source=self.source,
+            metamodel=self.metamodel,
+            _naming=self._naming,
+            _labeling=self._labeling,
+            _base=self,
+        )
+
+    def _init_overlay(self):
+        base = self._base
+        self.elements = OverlayElements(base.elements, make_view=self._make_view)
+        self._referenced_models = list(base._referenced_models)
+        self._model_index = ChainMap({}, base._model_index)
+        for key in OVERLAY_COLLECTIONS:
+            delattr(self, key)
+
+    def _make_view(self, element: "Element") -> "Element":
+        """Make the overlay's element for an element of its base, sharing its
+        data until it is changed (see `_prepare_change`).
+
+        What is cached in the derived entries of the view (e.g., its label)
+        is kept in the view, so it never reaches the base or other overlays.
+        """
+        self._shared_ids.add(element._id)
+        return Element(
+            _id=element._id,
+            _data=element._data,
+            _model=self,
+            _metamodel_hints=element._metamodel_hints,
+            _metatype=element._metatype,
+            _derived=ChainMap({}, element._derived),
+            _is_abstract=element._is_abstract,
+            _is_proxy=False,
+            _is_relationship=element._is_relationship,
+        )
+
+    def _add_owned_from_base(self):
+        """Same as `_add_owned_lazily`, with the owned collections of the base
+        of an overlay model.
+        """
+        base = self._base
+        self._set_lazy_collections(
+            list(base.all_relationships),
+            list(base.all_non_relationships),
+            [element._id for element in base.ownedElement],
+            [element._id for element in base.ownedRelationship],
+            {
+                metatype: [element._id for element in elements]
+                for metatype, elements in base.ownedMetatype.items()
+            },
+        )
+
+    def materialize(self):
+        """Make all the elements and owned element collections of a lazily
+        loaded model now, instead of when they are first used.
+        """
+        for collection in (
+            self.elements,
+            self.all_relationships,
+            self.all_non_relationships,
+            self.ownedMetatype,
+        ):
+            collection.values()
 
     def _add_labels(self, *elements):
         """Attempts to add a label to the elements."""
@@ -391,15 +1409,158 @@ class Model:  # pylint: disable=too-many-instance-attributes
             element for element in owned if not element._is_relationship
         )
 
-        self.ownedRelationship = [
+        self.ownedRelationship = ElementList(
             relationship for relationship in owned if relationship._is_relationship
-        ]
+        )
 
-        by_metatype = defaultdict(list)
+        by_metatype = defaultdict(ElementList)
         for element in elements.values():
             by_metatype[element._metatype].append(element)
         self.ownedMetatype = dict(by_metatype)
 
+    def _materialize_element(self, id_: str, data: dict) -> "Element":
+        """Make the Element for the data of a lazily loaded element, with the
+        derived entries of the relationships it is an end of.
+        """
+        initializing, self._initializing = self._initializing, True
+        try:
+            element = Element(
+                _id=id_,
+                _data=data if self._owns_data else {**data, "@id": id_},
+                _model=self,
+                _metamodel_hints=self._metamodel_hints[data["@type"]],
+            )
+        finally:
+            self._initializing = initializing
+
+        elements = self.elements
+        for relationship_id in self._relationships_by_end.get(id_, ()):
+            relationship = dict.__getitem__(elements, relationship_id)
+            relationship_data = getattr(relationship, "_data", relationship)
+            metatype = relationship_data["@type"]
+            sources = relationship_data["source"]
+            targets = relationship_data["target"]
+            for source in sources:
+                if source["@id"] == id_:
+                    element._derived[f"through{metatype}"] += [
+                        {"@id": target["@id"]} for target in targets
+                    ]
+            for target in targets:
+                if target["@id"] == id_:
+                    element._derived[f"reverse{metatype}"] += [
+                        {"@id": source["@id"]} for source in sources
+                    ]
+        return element
+
+    def _add_owned_lazily(self):
+        """Same as `_add_owned`, but only makes the Element objects for the
+        elements without an owner.
+        """
+        relationship_ids, non_relationship_ids = [], []
+        owned_relationships, owned_elements = [], []
+        by_metatype = defaultdict(list)
+        for id_, data in dict.items(self.elements):
+            is_relationship = "source" in data and "target" in data
+            is_owned = all(
+                (data.get(key) or {}).get("@id") is None for key in OWNER_KEYS
+            )
+            by_metatype[data["@type"]].append(id_)
+            if is_relationship:
+                relationship_ids.append(id_)
+                if is_owned:
+                    owned_relationships.append(id_)
+            else:
+                non_relationship_ids.append(id_)
+                if is_owned:
+                    owned_elements.append(id_)
+
+        self._set_lazy_collections(
+            relationship_ids,
+            non_relationship_ids,
+            owned_elements,
+            owned_relationships,
+            by_metatype,
+        )
+
+    def _set_lazy_collections(
+        self,
+        relationship_ids: list[str],
+        non_relationship_ids: list[str],
+        owned_elements: list[str],
+        owned_relationships: list[str],
+        by_metatype: dict[str, list[str]],
+    ):
+        elements = self.elements
+        self.all_relationships = LazyElements(
+            dict.fromkeys(relationship_ids), materialize=lambda id_, _: elements[id_]
+        )
+        self.all_non_relationships = LazyElements(
+            dict.fromkeys(non_relationship_ids),
+            materialize=lambda id_, _: elements[id_],
+        )
+        self.ownedElement = ListOfNamedItems(elements[id_] for id_ in owned_elements)
+        self.ownedRelationship = ElementList(
+            elements[id_] for id_ in owned_relationships
+        )
+        self.ownedMetatype = LazyElementLists(by_metatype, model=self)
+
+    def _add_owned_from_snapshot(self):
+        """Same as `_add_owned_lazily`, but with the elements and owned
+        collections read from the model's snapshot.
+        """
+        snapshot = self._snapshot
+        ids = snapshot.ids
+        collections = snapshot.collections
+        self.elements = LazyElements(
+            zip(ids, range(len(ids))),
+            materialize=self._materialize_snapshot_element,
+            read_data=lambda _, row: snapshot.read(row)[0],
+        )
+        relationship_rows = set(collections["relationships"])
+        self._set_lazy_collections(
+            [ids[row] for row in collections["relationships"]],
+            [id_ for row, id_ in enumerate(ids) if row not in relationship_rows],
+            [ids[row] for row in collections["ownedElement"]],
+            [ids[row] for row in collections["ownedRelationship"]],
+            {
+                metatype: [ids[row] for row in rows]
+                for metatype, rows in collections["ownedMetatype"].items()
+            },
+        )
+
+    def _materialize_snapshot_element(self, id_: str, row: int) -> "Element":
+        data, derived = self._snapshot.read(row)
+        element = self._materialize_element(id_, data)
+        element._derived.update(derived)
+        return element
+
+    def _index_relationship_ends(self):
+        """Index the relationships by the ids of their ends, so the derived
+        relationship entries can be added to lazily loaded elements.
+
+        As with `_add_relationships`, relationships with ends that are not in
+        the model, or whose ends are not lists, are left out.
+        """
+        relationships_by_end = defaultdict(list)
+        elements = self.elements
+        for id_, data in dict.items(elements):
+            if "source" not in data or "target" not in data:
+                continue
+            ends = (data["source"], data["target"])
+            if not all(isinstance(end, list) for end in ends):
+                continue
+            end_ids = {reference["@id"] for end in ends for reference in end}
+            missing_ids = [end_id for end_id in end_ids if end_id not in elements]
+            if missing_ids:
+                warn(
+                    f"Could not retrieve {missing_ids} call was from a relation "
+                    f"of type {data['@type']}."
+                )
+                continue
+            for end_id in end_ids:
+                relationships_by_end[end_id].append(id_)
+        self._relationships_by_end = dict(relationships_by_end)
+
     def _add_relationships(self):
         """Adds relationships to elements."""
         # TODO: make this more elegant...  maybe.
@@ -407,6 +1568,15 @@ class Model:  # pylint: disable=too-many-instance-attributes
             self._add_relationship(relationship)
 
     def _add_relationship(self, relationship):
+        if self._batch_depth:
+            self._staged.relationships.append(relationship)
+        elif not self._link_relationship(relationship):
+            return
+        if not self._initializing:
+            self._notify(ChangeKind.RELATIONSHIP_ADDED, relationship)
+
+    def _link_relationship(self, relationship) -> bool:
+        """Let the ends of a relationship navigate it, if they can be found."""
         relationship_mapper = {
             "through": ("source", "target"),
             "reverse": ("target", "source"),
@@ -425,7 +1595,7 @@ class Model:  # pylint: disable=too-many-instance-attributes
                 str(likley_id_error)
                 + f" call was from a relation of type {relationship._metatype}."
             )
-            return
+            return False
 
         except TypeError:
             # may be malformed with just one source and target - this compensates for that case
@@ -460,25 +1630,51 @@ class Model:  # pylint: disable=too-many-instance-attributes
                         ]
                     }
                 )
-            return
+            return False
 
         metatype = relationship._metatype
         for direction, (key1, key2) in relationship_mapper.items():
             endpts1, endpts2 = endpoints[key1], endpoints[key2]
             for endpt1 in endpts1:
+                # elements of read-only (e.g., shared library) models are left
+                # untouched by the relationships of the models referencing them
+                if endpt1._model._read_only:
+                    continue
+                endpt1._model._prepare_change(endpt1)
                 for endpt2 in endpts2:
-                    endpt1._derived[f"{direction}{metatype}"] += [
-                        {"@id": endpt2._data["@id"]}
-                    ]
+                    endpt1._derived[f"{direction}{metatype}"].append(endpt2)
+        return True
 
     def reference_other_model(self, ref_model: "Model"):
+        """Use the elements of another model (e.g., a library) when an element
+        is not found in this one.
+
+        The ids of the elements in the referenced model, and in the models it
+        references, are indexed so that finding the model that holds an element
+        is a single lookup. The models referenced first take precedence, and
+        referencing a model again indexes the elements added to it since.
+        """
         if ref_model not in self._referenced_models:
             self._referenced_models.append(ref_model)
+        model_index = self._model_index
+        for id_ in ref_model.elements:
+            model_index.setdefault(id_, ref_model)
+        for id_, model in ref_model._model_index.items():
+            model_index.setdefault(id_, model)
 
+    def get_referenced_model(self, element_id: str) -> "Model | None":
+        """The referenced model that holds an element, if any."""
+        return self._model_index.get(element_id)
 
-@dataclass(repr=False)
+
+@dataclass(repr=False, slots=True)
 class Element:  # pylint: disable=too-many-instance-attributes
-    """A SysML v2 Element."""
+    """A SysML v2 Element.
+
+    Elements use slots rather than an instance dictionary, since there can be
+    hundreds of thousands of them. The SysML attributes are only stored in
+    `_data`, and are looked up from there by `__getattr__`.
+    """
 
     _data: dict[str, Any]
     _model: Model
@@ -487,6 +1683,8 @@ class Element:  # pylint: disable=too-many-instance-attributes
 
     _id: str = field(default_factory=lambda: str(uuid4()))
     _metatype: str = "Element"
+    # derived values, including the elements related to this one, keyed by direction and
+    # relationship metatype (e.g., `throughFeatureTyping`), see `get_related`
     _derived: dict[str, list] = field(default_factory=lambda: defaultdict(list))
     # TODO: replace this with instances sequences
     # _instances: List["Instance"] = field(default_factory=list)
@@ -523,13 +1721,6 @@ class Element:  # pylint: disable=too-many-instance-attributes
             # set up owned elements to be referencable by their name
             if key.startswith("owned") and isinstance(items, list):
                 data[key] = ListOfNamedItems(items)
-            # add Pythonic property to Element object based on metamodel for primary data values
-            elif (
-                key in self._metamodel_hints
-                and not self._metamodel_hints[key]["derived"]
-                and not self._metamodel_hints[key]["is_reference"]
-            ):
-                setattr(self, key, items)
         if not model._initializing:
             self._model._add_element(self)
         self._is_proxy = False
@@ -542,7 +1733,7 @@ class Element:  # pylint: disable=too-many-instance-attributes
     def __dir__(self):
         return sorted(
             set(
-                list(super().__dir__())
+                list(object.__dir__(self))
                 + [key for key in [*self._data, *self._derived] if key.isidentifier()]
             )
         )
@@ -557,6 +1748,14 @@ class Element:  # pylint: disable=too-many-instance-attributes
 
     # TODO: Make this safe for through and reverse by return empty collection is no key found
     def __getattr__(self, key: str):
+        if key.startswith("_"):
+            # private attributes are all slots, so don't look for them in the data
+            raise AttributeError(f"Cannot find {key}")
+        # primary data values (per the metamodel) are not references, so return them as they are
+        if key in self._metamodel_hints and key in self._data:
+            hints = self._metamodel_hints[key]
+            if not hints["derived"] and not hints["is_reference"]:
+                return self._data[key]
         try:
             return self[key]
         except KeyError as exc:
@@ -667,8 +1866,29 @@ class Element:  # pylint: disable=too-many-instance-attributes
             self._package = owner
         return self._package
 
-    @lru_cache(maxsize=1024)
     def is_in_package(self, package: "Element") -> bool:
+        """Whether the element is (directly or indirectly) owned by a package."""
+        if package._metatype != "Package":
+            return False
+        ownership = self._model._get_ownership()
+        if ownership is None:
+            # the index is out of date, so walk up the owners, as far as they
+            # can be found and do not go around an ownership cycle
+            element, visited_ids = self, set()
+            while element._id not in visited_ids:
+                visited_ids.add(element._id)
+                try:
+                    element = element.get_owner()
+                except KeyError:
+                    return False
+                if element is None:
+                    return False
+                if element._id == package._id:
+                    return True
+            return False
+        if self._id in ownership and package._id in ownership:
+            return ownership.is_under(self._id, package._id)
+        # the package is in another (e.g., library) model
         owning_package = self.owning_package
         while owning_package:
             if owning_package == package:
@@ -682,16 +1902,57 @@ class Element:  # pylint: disable=too-many-instance-attributes
         except KeyError:
             return default
 
+    def set(self, key: str, value: Any):
+        """Set the value of an attribute in the element's data, and let the
+        model's subscribers know.
+        """
+        self._model._prepare_change(self)
+        if key.startswith("owned") and isinstance(value, list):
+            value = ListOfNamedItems(value)
+        self._data[key] = value
+        if key in OWNER_KEYS:
+            self._package = None
+        if key in ("declaredName", "name"):
+            self._derived.pop("label", None)
+        self._model._notify(ChangeKind.ATTRIBUTE_SET, self, attribute=key)
+
+    def get_related(
+        self,
+        metatype: str,
+        direction: str = "through",
+        include_subtypes: bool = False,
+    ) -> list["Element"]:
+        """Get the elements related to this one by relationships of a metatype.
+
+        The "through" direction gets the targets of the relationships this
+        element is a source of, and "reverse" the sources of the ones it is a
+        target of. With `include_subtypes`, relationships of metatypes that
+        specialize the given one are included too, e.g., "Membership" also
+        gets the elements related by OwningMemberships and FeatureMemberships.
+        """
+        if direction not in ("through", "reverse"):
+            raise ValueError(
+                f"Relationship direction must be 'through' or 'reverse', not '{direction}'"
+            )
+        derived = self._derived
+        if include_subtypes:
+            metatypes = self._model.metamodel.get_subtypes(metatype)
+            prefix_length = len(direction)
+            related = [
+                item
+                for key, items in derived.items()
+                if key.startswith(direction) and key[prefix_length:] in metatypes
+                for item in items
+            ]
+        else:
+            related = derived.get(f"{direction}{metatype}", ())
+        return [self.__safe_dereference(item) for item in related]
+
     def get_element(self, element_id) -> "Element":
         return self._model.get_element(element_id)
 
     def get_owner(self) -> "Element":
-        data = self._data
-        owner_id = None
-        for key in OWNER_KEYS:
-            owner_id = (data.get(key) or {}).get("@id")
-            if owner_id is not None:
-                break
+        owner_id = get_owner_id(self._data)
         if owner_id is None:
             return None
         try:
@@ -704,8 +1965,8 @@ class Element:  # pylint: disable=too-many-instance-attributes
                 ) from no_owner
 
             playback_name = str(self)
-            if "declaredName" in data.keys():
-                playback_name = data["declaredName"]
+            if "declaredName" in self._data:
+                playback_name = self._data["declaredName"]
             raise KeyError(
                 f"Failed to find element with id {owner_id} while "
                 + f"looking for owner of {playback_name}"
@@ -714,6 +1975,7 @@ class Element:  # pylint: disable=too-many-instance-attributes
     @staticmethod
     def new(data: dict, model: Model) -> "Element":
         return Element(
+            _id=data["@id"],
             _data=data,
             _model=model,
             _metamodel_hints=model._metamodel_hints[data["@type"]],
@@ -721,6 +1983,12 @@ class Element:  # pylint: disable=too-many-instance-attributes
 
     def __safe_dereference(self, item):
         """If given a reference to another element, try to get that element."""
+        if isinstance(item, Element):
+            model = self._model
+            if model._base is None or item._model is model:
+                return item
+            # use the overlay's element instead of the one of its base
+            return model.get_element(item._id)
         try:
             if isinstance(item, dict) and "@id" in item:
                 if len(item) > 1:
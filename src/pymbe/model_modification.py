@@ -1,4 +1,3 @@
-import copy
 from typing import Any
 from uuid import uuid4
 
@@ -16,7 +15,8 @@ def create_element_data_dictionary(
     based on templates from base Ecore definitions."""
     new_id = str(uuid4())
 
-    new_element_data = copy.deepcopy(model.metamodel.pre_made_dicts[metaclass])
+    # the metamodel already hands out a private copy of the template
+    new_element_data = model.metamodel.pre_made_dicts[metaclass]
 
     new_element_data["declaredName"] = name
     new_element_data["name"] = name
@@ -418,6 +418,7 @@ def new_element_ownership_pattern(
     owner: Element, ele: Element, model: Model, member_kind: str = "OwningMembership"
 ):
     """Common helper to link new elements to their owners."""
+    owner._model._prepare_change(owner)
     member_name = ""
     if "declaredName" in ele._data:
         member_name = ele.declaredName
@@ -441,8 +442,8 @@ def new_element_ownership_pattern(
     # should make this more automatic in core code, but add new_om to owner's ownedRelationship
     # a lot of these entailments will be a pain and need to manage them actively
 
-    owner._data["ownedRelationship"].append({"@id": new_om._id})
-    ele._data["owningRelationship"] = {"@id": new_om._id}
+    model._append_to(owner, "ownedRelationship", {"@id": new_om._id})
+    ele.set("owningRelationship", {"@id": new_om._id})
 
     return new_om
 
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pymbe.model import Model
+
+OWNER_KEYS = ("owner", "owningRelatedElement", "owningRelationship")
+NO_PARENT = -1
+
+
+def get_owner_id(data: dict) -> str | None:
+    """The id of the owner of an element, from its data."""
+    for key in OWNER_KEYS:
+        owner_id = (data.get(key) or {}).get("@id")
+        if owner_id is not None:
+            return owner_id
+    return None
+
+
+@dataclass(frozen=True)
+class OwnershipIndex:
+    """An index of the ownership tree of the elements of a model.
+
+    The elements are numbered in the order of a depth-first tour of the tree,
+    so the elements under an element are the ones numbered after it and
+    before its `ends` number. Whether an element is under another is then
+    one comparison, and getting all the elements under one is a slice.
+
+    Elements whose owner is not in the model (e.g., is in a library) are
+    roots of the tree.
+    """
+
+    ids: list[str]  # the element ids, in the order of the tour
+    positions: dict[str, int]  # the position of each id in the tour
+    ends: list[int]  # the position just after the last element under each one
+    parents: list[int]  # the position of the owner of each element
+    depths: list[int]  # how many owners each element has in the model
+
+    @staticmethod
+    def from_model(model: "Model") -> "OwnershipIndex":
+        owner_ids = {
+            id_: get_owner_id(element._data) for id_, element in model.elements.items()
+        }
+
+        children = {}
+        roots = []
+        for id_, owner_id in owner_ids.items():
+            if owner_id in owner_ids and owner_id != id_:
+                children.setdefault(owner_id, []).append(id_)
+            else:
+                roots.append(id_)
+
+        ids, ends, parents, depths = [], [], [], []
+        positions = {}
+
+        def visit(root: str):
+            # iterative, as ownership trees can be deeper than the recursion limit
+            stack = [(root, NO_PARENT, 0)]
+            while stack:
+                id_, parent, depth = stack.pop()
+                if id_ is None:
+                    # all the elements under this one have been numbered
+                    ends[parent] = len(ids)
+                    continue
+                if id_ in positions:
+                    continue
+                position = positions[id_] = len(ids)
+                ids.append(id_)
+                ends.append(position + 1)
+                parents.append(parent)
+                depths.append(depth)
+                stack.append((None, position, depth))
+                stack.extend(
+                    (child, position, depth + 1)
+                    for child in reversed(children.get(id_, ()))
+                )
+
+        for root in roots:
+            visit(root)
+        # elements in an ownership cycle are not under any root
+        for id_ in owner_ids:
+            if id_ not in positions:
+                visit(id_)
+
+        return OwnershipIndex(
+            ids=ids, positions=positions, ends=ends, parents=parents, depths=depths
+        )
+
+    def __contains__(self, element_id: str) -> bool:
+        return element_id in self.positions
+
+    def is_under(self, element_id: str, ancestor_id: str) -> bool:
+        """Whether an element is (directly or indirectly) owned by another."""
+        position = self.positions[element_id]
+        ancestor_position = self.positions[ancestor_id]
+        return ancestor_position < position < self.ends[ancestor_position]
+
+    def get_subtree(self, element_id: str, include_self: bool = False) -> list[str]:
+        """The ids of all the elements (directly or indirectly) owned by an
+        element, in depth-first order.
+        """
+        position = self.positions[element_id]
+        start = position if include_self else position + 1
+        return self.ids[start : self.ends[position]]
+
+    def get_owner_id(self, element_id: str) -> str | None:
+        parent = self.parents[self.positions[element_id]]
+        return None if parent == NO_PARENT else self.ids[parent]
+
+    def get_owner_ids(self, element_id: str) -> list[str]:
+        """The ids of the owners of an element in the model, nearest first."""
+        owner_ids = []
+        parent = self.parents[self.positions[element_id]]
+        while parent != NO_PARENT:
+            owner_ids.append(self.ids[parent])
+            parent = self.parents[parent]
+        return owner_ids
+
+    def get_depth(self, element_id: str) -> int:
+        return self.depths[self.positions[element_id]]
@@ -0,0 +1,185 @@
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from pymbe.changes import ChangeKind, ModelChange
+from pymbe.ownership import OWNER_KEYS, get_owner_id
+from pymbe.query.metamodel_navigator import get_effective_basic_name
+
+if TYPE_CHECKING:
+    from pymbe.model import Element, Model
+
+SEPARATOR = "::"
+NAME_KEYS = ("declaredName", "name", "effectiveName")
+
+
+class TrieNode:
+    """A node of a qualified name trie, with the ids of the elements named by
+    the path of name segments leading to it.
+    """
+
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: dict[str, TrieNode] = {}
+        self.ids: list[str] = []
+
+
+class QualifiedNameIndex:
+    """A trie of the qualified names of the elements of a model, with a node
+    for each name segment (e.g., `Vehicle`, then `wheels`, for
+    `Vehicle::wheels`).
+
+    An element's qualified name is that of its owning namespace followed by
+    its effective name (see `get_effective_basic_name`). Elements without a
+    name, and the ones they own, have no qualified name, except for the
+    members of an unnamed root namespace, whose qualified name is their name.
+
+    The index follows the changes made to the model, so it stays up to date
+    as elements are added, renamed or moved (e.g., by `model_modification`).
+    """
+
+    def __init__(self, model: "Model"):
+        self._model = model
+        self._root = TrieNode()
+        self._paths: dict[str, tuple[str, ...]] = {}
+        self._namespaces: dict[str, str] = {}  # the owning namespace of each element
+        self._members: dict[str, set[str]] = {}  # the elements owned by each namespace
+
+        elements = model.elements
+        # owners come before the elements they own in the ownership tour
+        for id_ in model.ownership.ids:
+            self._add(elements[id_])
+        model.subscribe(self._follow_change)
+
+    def get(self, qualified_name: str | Sequence[str]) -> list[str]:
+        """The ids of the elements with a qualified name."""
+        node = self._find_node(qualified_name)
+        return list(node.ids) if node else []
+
+    def get_ids_under(self, qualified_name: str | Sequence[str]) -> list[str]:
+        """The ids of all the elements whose qualified names start with a
+        qualified name, e.g., everything under `Vehicle::`.
+        """
+        node = self._find_node(qualified_name)
+        if node is None:
+            return []
+        ids = []
+        stack = list(node.children.values())
+        while stack:
+            node = stack.pop()
+            ids += node.ids
+            stack += node.children.values()
+        return ids
+
+    def get_qualified_name(self, element_id: str) -> str | None:
+        path = self._paths.get(element_id)
+        return SEPARATOR.join(path) if path else None
+
+    def __contains__(self, qualified_name: str | Sequence[str]) -> bool:
+        node = self._find_node(qualified_name)
+        return bool(node and node.ids)
+
+    def _find_node(self, qualified_name: str | Sequence[str]) -> TrieNode | None:
+        if isinstance(qualified_name, str):
+            qualified_name = qualified_name.split(SEPARATOR)
+        node = self._root
+        for segment in qualified_name:
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def _get_namespace_id(self, element: "Element") -> str | None:
+        """The id of the nearest owner that is not a relationship (e.g., the
+        namespace owning the membership that owns the element).
+        """
+        elements = self._model.elements
+        owner_id = get_owner_id(element._data)
+        while owner_id is not None and owner_id in elements:
+            owner = elements[owner_id]
+            if not owner._is_relationship:
+                return owner_id
+            owner_id = get_owner_id(owner._data)
+        return owner_id
+
+    def _get_namespace_path(self, namespace_id: str) -> tuple[str, ...] | None:
+        path = self._paths.get(namespace_id)
+        if path is not None:
+            return path
+        namespace = self._model.elements.get(namespace_id)
+        is_unnamed_root = (
+            namespace is not None
+            and namespace_id not in self._namespaces
+            and not get_effective_basic_name(namespace)
+        )
+        return () if is_unnamed_root else None
+
+    def _add(self, element: "Element"):
+        if element._is_relationship:
+            return
+        id_ = element._id
+        namespace_id = self._get_namespace_id(element)
+        if namespace_id is not None:
+            self._namespaces[id_] = namespace_id
+            self._members.setdefault(namespace_id, set()).add(id_)
+
+        name = get_effective_basic_name(element)
+        if not name:
+            return
+        if namespace_id is None:
+            path = (name,)
+        else:
+            namespace_path = self._get_namespace_path(namespace_id)
+            if namespace_path is None:
+                return
+            path = (*namespace_path, name)
+
+        self._paths[id_] = path
+        node = self._root
+        for segment in path:
+            node = node.children.setdefault(segment, TrieNode())
+        node.ids.append(id_)
+
+    def _remove(self, id_: str):
+        namespace_id = self._namespaces.pop(id_, None)
+        if namespace_id is not None:
+            self._members[namespace_id].discard(id_)
+
+        path = self._paths.pop(id_, None)
+        if path is None:
+            return
+        nodes = [self._root]
+        for segment in path:
+            nodes.append(nodes[-1].children[segment])
+        nodes[-1].ids.remove(id_)
+        # drop the nodes left without elements
+        for parent, segment in zip(reversed(nodes[:-1]), reversed(path)):
+            node = parent.children[segment]
+            if node.ids or node.children:
+                break
+            del parent.children[segment]
+
+    def _update(self, element: "Element"):
+        """Index an element, and all the elements it owns, again."""
+        ids = [element._id]
+        for id_ in ids:
+            ids += self._members.get(id_, ())
+        for id_ in reversed(ids):
+            self._remove(id_)
+        elements = self._model.elements
+        for id_ in ids:
+            self._add(elements[id_])
+
+    def _follow_change(self, change: ModelChange):
+        element = change.element
+        if change.kind is ChangeKind.ELEMENT_ADDED:
+            self._update(element)
+        elif change.kind is ChangeKind.ATTRIBUTE_SET:
+            if change.attribute in OWNER_KEYS or change.attribute in NAME_KEYS:
+                self._update(element)
+        elif element._metatype == "Redefinition":
+            # redefining features take the name of the features they redefine
+            for source in element.source:
+                # the sources may be ids, or elements of other (e.g., library) models
+                if getattr(source, "_model", None) is self._model:
+                    self._update(source)
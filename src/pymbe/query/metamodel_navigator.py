@@ -321,30 +321,15 @@ def get_more_general_types(typ, recurse_counter, max_counter):
         + typ.throughRedefinition
     )
 
-    # check to see if this is a library object
-    # TODO: This is very hacky, need to check on library connections much better
-
+    # replace the types found in a referenced (library) model with the library elements
     lib_local = []
     lib_remove = []
 
     for local_general in local_more_general:
-        if len(typ._model._referenced_models) > 0:
-            if hasattr(local_general, "isLibraryElement"):
-                if local_general._data["isLibraryElement"]:
-                    trial_element = typ._model._referenced_models[0].get_element(
-                        local_general._id
-                    )
-                    lib_local.append(trial_element)
-                    lib_remove.append(local_general)
-            else:
-                try:
-                    trial_element = typ._model._referenced_models[0].get_element(
-                        local_general._id
-                    )
-                    lib_local.append(trial_element)
-                    lib_remove.append(local_general)
-                except KeyError:
-                    pass
+        library_model = typ._model.get_referenced_model(local_general._id)
+        if library_model is not None:
+            lib_local.append(library_model.get_element(local_general._id))
+            lib_remove.append(local_general)
 
     for to_remove in lib_remove:
         local_more_general.remove(to_remove)
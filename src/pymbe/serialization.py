@@ -0,0 +1,344 @@
+import gzip
+import hashlib
+import json
+import marshal
+import re
+import sys
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any, TextIO
+from warnings import warn
+
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = " \t\n\r"
+# what may follow an item of an array, so the item cannot continue after it
+ITEM_END = re.compile(r"[ \t\n\r,\]]")
+# the longest token a decoding error may point to the start of when it is
+# cut at the end of a chunk (i.e., "-Infinity")
+MAX_CUT_TOKEN = 9
+
+
+def make_reference_hook(references: dict[str, dict]) -> Callable[[dict], dict]:
+    """Make an `object_hook` for decoding element data that shares the
+    `{"@id": ...}` references, and the id and metatype strings, between all
+    the decoded elements instead of repeating them for every reference.
+
+    The first reference decoded for an id is the one kept in `references`.
+    """
+
+    def share_references(obj: dict) -> dict:
+        id_ = obj.get("@id")
+        if id_ is not None:
+            if len(obj) == 1:
+                return references.setdefault(id_, obj)
+            reference = references.get(id_)
+            if reference is None:
+                reference = references[id_] = {"@id": id_}
+            obj["@id"] = reference["@id"]
+        metatype = obj.get("@type")
+        if metatype is not None:
+            obj["@type"] = sys.intern(metatype)
+        return obj
+
+    return share_references
+
+
+def make_interning_decoder(
+    references: dict[str, dict] | None = None,
+) -> json.JSONDecoder:
+    """A JSON decoder that interns the keys of the objects it decodes, and
+    shares their references (see `make_reference_hook`).
+
+    Decoding a whole file at once shares the key strings between all the
+    objects, this keeps that sharing when the objects are decoded one by one.
+    """
+    share_references = make_reference_hook({} if references is None else references)
+    return json.JSONDecoder(
+        object_pairs_hook=lambda pairs: share_references(
+            {sys.intern(key): value for key, value in pairs}
+        )
+    )
+
+
+def iter_json_array(
+    fp: TextIO,
+    chunk_size: int = CHUNK_SIZE,
+    references: dict[str, dict] | None = None,
+) -> Iterator[Any]:
+    """Lazily decode the items of a top-level JSON array, one at a time.
+
+    Only the item being decoded (and at most one chunk of the file) is held
+    in memory, instead of the whole file text plus the whole decoded list.
+    """
+    decoder = make_interning_decoder(references)
+    buffer, pos, at_eof = "", 0, False
+
+    def read_more() -> bool:
+        nonlocal buffer, pos, at_eof
+        chunk = fp.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        at_eof = not chunk
+        return not at_eof
+
+    def next_token() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more():
+                raise ValueError("Unexpected end of file while reading JSON array")
+
+    if next_token() != "[":
+        raise ValueError("Expected the JSON data to be an array of elements")
+    pos += 1
+    if next_token() == "]":
+        return
+
+    while True:
+        next_token()
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as error:
+            # only an item cut at the end of the buffer may decode with more of it
+            is_cut = error.msg.startswith("Unterminated string") or (
+                error.pos >= len(buffer) - MAX_CUT_TOKEN
+            )
+            if not is_cut:
+                raise ValueError(f"Invalid JSON array item: {error}") from error
+            if not read_more():
+                raise ValueError(
+                    "Unexpected end of file while reading JSON array"
+                ) from error
+            continue
+        # an item (e.g., the number 1.5e10) may continue in the next chunk,
+        # until something that cannot be part of it is found after it
+        if not at_eof and not ITEM_END.search(buffer, end):
+            read_more()
+            continue
+        pos = end
+        yield item
+
+        separator = next_token()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}")
+
+
+def open_element_data_file(
+    filepath: Path, mode: str = "r", encoding: str = "utf-8"
+) -> TextIO:
+    """Open a JSON file of elements as text, compressing it with gzip if its
+    name ends with `.gz`.
+    """
+    if Path(filepath).suffix == ".gz":
+        return gzip.open(filepath, f"{mode}t", encoding=encoding)
+    return open(filepath, mode, encoding=encoding)
+
+
+def factor_element_data(raw_element: dict) -> dict:
+    """Return the element data from either a plain element or one formatted to
+    POST to the v2 API (with `identity` and `payload` fields).
+
+    The returned data always includes the element's `@id`, and reuses the
+    raw element's dictionary instead of copying it.
+    """
+    if "payload" not in raw_element:
+        return raw_element
+    data = raw_element["payload"]
+    data["@id"] = raw_element["identity"]["@id"]
+    return data
+
+
+def post_element_data(data: dict) -> dict:
+    """Format the data of an element to POST to the v2 API, the inverse of
+    `factor_element_data`.
+    """
+    return {
+        "payload": {key: value for key, value in data.items() if key != "@id"},
+        "identity": {"@id": data["@id"]},
+    }
+
+
+def write_element_data(
+    fp: TextIO,
+    element_data: Iterable[dict],
+    indent: int | None = 2,
+    post_format: bool = False,
+):
+    """Write the data of elements to a file as a JSON array, one element at a
+    time, in either the plain or the POST format.
+
+    Only one element is encoded at a time, and the text is the same as that of
+    `json.dump` on the whole list.
+    """
+    if indent is None:
+        newline, separator = "", ", "
+    else:
+        newline = "\n" + " " * indent
+        separator = "," + newline
+
+    fp.write("[")
+    is_empty = True
+    for data in element_data:
+        if post_format:
+            data = post_element_data(data)
+        fp.write(newline if is_empty else separator)
+        fp.write(json.dumps(data, indent=indent).replace("\n", newline))
+        is_empty = False
+    if not is_empty and indent is not None:
+        fp.write("\n")
+    fp.write("]")
+
+
+def iter_element_data(
+    fp: TextIO,
+    stream: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    references: dict[str, dict] | None = None,
+) -> Iterator[dict]:
+    """Iterate over the data of the elements in a JSON file, in either the
+    plain or the POST format.
+
+    If `stream` is True, the elements are decoded one at a time, which keeps
+    the peak memory close to the size of the elements rather than the size of
+    the file, at the cost of a slower decoding.
+
+    The references are shared between the elements (see `make_reference_hook`),
+    and with those of other files decoded with the same `references`.
+    """
+    if references is None:
+        references = {}
+    raw_elements = (
+        iter_json_array(fp, chunk_size=chunk_size, references=references)
+        if stream
+        else json.load(fp, object_hook=make_reference_hook(references))
+    )
+    for raw_element in raw_elements:
+        yield factor_element_data(raw_element)
+
+
+def iter_ndjson_element_data(
+    lines: Iterable[str], references: dict[str, dict] | None = None
+) -> Iterator[dict]:
+    """Iterate over the data of the elements in newline-delimited JSON, one
+    element per line, in either the plain or the POST format.
+
+    Blank lines are skipped, and the references are shared as in
+    `iter_element_data`.
+    """
+    decoder = make_interning_decoder(references)
+    for line in lines:
+        if line.strip():
+            yield factor_element_data(decoder.decode(line))
+
+
+def write_ndjson_element_data(
+    fp: TextIO, element_data: Iterable[dict], post_format: bool = False
+):
+    """Write the data of elements to a file as newline-delimited JSON, one
+    element per line, in either the plain or the POST format.
+    """
+    for data in element_data:
+        if post_format:
+            data = post_element_data(data)
+        fp.write(json.dumps(data))
+        fp.write("\n")
+
+
+def split_ndjson_file(filepath: Path, chunk_count: int) -> list[tuple[int, int]]:
+    """Split a newline-delimited JSON file into about `chunk_count` ranges of
+    bytes, made of whole lines, that can be decoded separately.
+    """
+    size = Path(filepath).stat().st_size
+    bounds = [0]
+    with open(filepath, "rb") as raw_fp:
+        for index in range(1, chunk_count):
+            raw_fp.seek(max(size * index // chunk_count, bounds[-1]))
+            # move on to the start of the next line
+            raw_fp.readline()
+            bounds.append(raw_fp.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def read_marshalled_ndjson_chunk(
+    filepath: Path, start: int, end: int, encoding: str = "utf-8"
+) -> bytes:
+    """Decode the elements in a range of bytes of a newline-delimited JSON
+    file (see `split_ndjson_file`), marshalled to bytes so it can be sent back
+    from a worker process.
+    """
+    with open(filepath, "rb") as raw_fp:
+        raw_fp.seek(start)
+        text = raw_fp.read(end - start).decode(encoding)
+    return marshal.dumps(list(iter_ndjson_element_data(text.split("\n"))))
+
+
+def read_element_data_file(
+    filepath: Path, encoding: str = "utf-8", stream: bool = False
+) -> list[dict]:
+    """Read the data of all the elements in a JSON file, in either the plain
+    or the POST format.
+    """
+    with open_element_data_file(filepath, encoding=encoding) as raw_fp:
+        return list(iter_element_data(raw_fp, stream=stream))
+
+
+def read_marshalled_element_data_file(
+    filepath: Path, encoding: str = "utf-8", stream: bool = False
+) -> bytes:
+    """Same as `read_element_data_file`, but marshalled to bytes so it can be
+    sent back from a worker process faster than pickling the dictionaries.
+    """
+    return marshal.dumps(read_element_data_file(filepath, encoding, stream))
+
+
+def hash_files(filepaths: Iterable[Path]) -> str:
+    """A short hash of the contents of some files, in order."""
+    digest = hashlib.sha256()
+    for filepath in filepaths:
+        with open(filepath, "rb") as raw_fp:
+            while chunk := raw_fp.read(CHUNK_SIZE):
+                digest.update(chunk)
+        # keep the boundaries between the files in the hash
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def merge_element_data(
+    element_data_by_source: Iterable[tuple[Any, Iterable[dict]]],
+) -> dict[str, dict]:
+    """Merge the element data from several sources into a single dictionary
+    keyed by element id.
+
+    Elements that appear in more than one source are reported in a warning,
+    and the last source they appear in wins.
+    """
+    merged: dict[str, dict] = {}
+    sources_by_id: dict[str, list] = defaultdict(list)
+    for source, element_data in element_data_by_source:
+        for data in element_data:
+            id_ = data["@id"]
+            merged[id_] = data
+            sources_by_id[id_].append(source)
+
+    duplicates = {
+        id_: sources for id_, sources in sources_by_id.items() if len(sources) > 1
+    }
+    if duplicates:
+        details = "\n".join(
+            f"  {id_}: {', '.join(map(str, sources))}"
+            for id_, sources in duplicates.items()
+        )
+        warn(
+            f"Found {len(duplicates)} element ids in more than one source, "
+            f"keeping the last one found:\n{details}"
+        )
+    return merged
@@ -0,0 +1,195 @@
+import marshal
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Any
+
+MAGIC = b"PYMBESNP"
+SNAPSHOT_VERSION = 1
+
+# magic, snapshot version, marshal version, python major and minor versions
+HEADER = struct.Struct("<8sIIII")
+SECTION = struct.Struct("<QQ")
+OFFSET = struct.Struct("<Q")
+
+# the sections of a snapshot, in the order they are written
+SECTIONS = ("info", "strings", "ids", "collections", "offsets", "records")
+
+
+def write_snapshot(filepath: Path, model: Any):
+    """Write the elements of a model to a binary snapshot file.
+
+    A snapshot holds:
+      - a table with the attribute names, metatypes and derived keys,
+      - the element ids, in the order of the model's elements,
+      - the model's owned element collections, as positions in the ids,
+      - the offset of the record of each element, so any one record can be
+        found without reading the others, and
+      - the records, with the element data keyed by position in the string
+        table, the element's related elements (its through/reverse entries)
+        and its label, so they need not be worked out again when reading it.
+
+    Everything is marshalled, so a snapshot can only be read by the same
+    Python version that wrote it.
+    """
+    elements = model.elements
+    ids = list(elements)
+    rows = {id_: row for row, id_ in enumerate(ids)}
+    strings: list[str] = []
+    string_codes: dict[str, int] = {}
+
+    def encode_string(string: str) -> int:
+        code = string_codes.get(string)
+        if code is None:
+            code = string_codes[string] = len(strings)
+            strings.append(string)
+        return code
+
+    def encode_reference(reference: Any) -> int | str:
+        # related elements outside the model (e.g., in a library) are kept by id
+        id_ = getattr(reference, "_id", None) or reference["@id"]
+        return rows.get(id_, id_)
+
+    records = []
+    for element in elements.values():
+        data = element._data
+        related = tuple(
+            (encode_string(key), tuple(map(encode_reference, items)))
+            for key, items in element._derived.items()
+            if key.startswith(("through", "reverse"))
+        )
+        records.append(
+            marshal.dumps(
+                (
+                    tuple(map(encode_string, data)),
+                    tuple(map(plain_value, data.values())),
+                    related,
+                    element._derived.get("label"),
+                )
+            )
+        )
+
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    def get_rows(items) -> list[int]:
+        return [rows[item._id] for item in items]
+
+    collections = {
+        "ownedElement": get_rows(model.ownedElement),
+        "ownedRelationship": get_rows(model.ownedRelationship),
+        "relationships": [rows[id_] for id_ in model.all_relationships],
+        "ownedMetatype": {
+            metatype: get_rows(items) for metatype, items in model.ownedMetatype.items()
+        },
+    }
+    info = {
+        "name": model.name,
+        "source": str(model.source) if model.source else None,
+    }
+    sections = [
+        marshal.dumps(info),
+        marshal.dumps(strings),
+        marshal.dumps(ids),
+        marshal.dumps(collections),
+        b"".join(OFFSET.pack(offset) for offset in offsets),
+        b"".join(records),
+    ]
+
+    position = HEADER.size + SECTION.size * len(sections)
+    section_table = []
+    for section in sections:
+        section_table.append(SECTION.pack(position, len(section)))
+        position += len(section)
+
+    with open(filepath, "wb") as snapshot_file:
+        snapshot_file.write(
+            HEADER.pack(MAGIC, SNAPSHOT_VERSION, marshal.version, *sys.version_info[:2])
+        )
+        snapshot_file.writelines(section_table)
+        snapshot_file.writelines(sections)
+
+
+def plain_value(value: Any) -> Any:
+    """Turn the list subclasses used in the element data into plain lists,
+    which can be marshalled.
+    """
+    if isinstance(value, list):
+        return [plain_value(item) for item in value]
+    return value
+
+
+class SnapshotReader:
+    """Reads a snapshot file through a memory map, only decoding the element
+    records that are asked for.
+    """
+
+    def __init__(self, filepath: Path):
+        with open(filepath, "rb") as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self._mmap
+
+        if len(buffer) < HEADER.size:
+            raise ValueError(f"'{filepath}' is not a pymbe snapshot")
+        magic, version, marshal_version, *python_version = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"'{filepath}' is not a pymbe snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"'{filepath}' is a version {version} snapshot, "
+                f"expected version {SNAPSHOT_VERSION}"
+            )
+        if marshal_version != marshal.version or tuple(python_version) != tuple(
+            sys.version_info[:2]
+        ):
+            raise ValueError(
+                f"'{filepath}' was saved by Python {'.'.join(map(str, python_version))}, "
+                "save it again with this version of Python"
+            )
+
+        if len(buffer) < HEADER.size + SECTION.size * len(SECTIONS):
+            raise ValueError(f"'{filepath}' is a truncated snapshot")
+        self._sections = {
+            name: SECTION.unpack_from(buffer, HEADER.size + SECTION.size * index)
+            for index, name in enumerate(SECTIONS)
+        }
+        if sum(self._sections["records"]) > len(buffer):
+            raise ValueError(f"'{filepath}' is a truncated snapshot")
+        self.info: dict[str, Any] = self._load_section("info")
+        self.strings: list[str] = [
+            sys.intern(string) for string in self._load_section("strings")
+        ]
+        self.ids: list[str] = self._load_section("ids")
+        self.collections: dict[str, Any] = self._load_section("collections")
+        self._offsets_start = self._sections["offsets"][0]
+        self._records_start = self._sections["records"][0]
+
+    def _load_section(self, name: str) -> Any:
+        start, length = self._sections[name]
+        return marshal.loads(self._mmap[start : start + length])
+
+    def read(self, row: int) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Decode the data of the element in a row, and its derived values:
+        its label and its related elements, as references keyed by direction
+        and relationship metatype.
+        """
+        position = self._offsets_start + row * OFFSET.size
+        (start,) = OFFSET.unpack_from(self._mmap, position)
+        (end,) = OFFSET.unpack_from(self._mmap, position + OFFSET.size)
+        start += self._records_start
+        end += self._records_start
+        keys, values, related, label = marshal.loads(self._mmap[start:end])
+
+        strings, ids = self.strings, self.ids
+        data = dict(zip([strings[key] for key in keys], values))
+        derived = {
+            strings[key]: [
+                {"@id": ids[item] if isinstance(item, int) else item} for item in items
+            ]
+            for key, items in related
+        }
+        if label is not None:
+            derived["label"] = label
+        return data, derived
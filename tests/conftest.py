@@ -5,6 +5,10 @@ import pytest
 
 import pymbe
 import pymbe.api as pm
+from pymbe.model_modification import (
+    build_from_classifier_pattern,
+    new_element_ownership_pattern,
+)
 
 PYMBE_ROOT = Path(pymbe.__file__).parent
 TESTS_ROOT = Path(__file__).parent
@@ -31,3 +35,51 @@ def load_kerml_library() -> pm.Model:
         library_model = pm.Model.load_from_post_file(lib_data)
 
     return library_model
+
+
+@pytest.fixture
+def small_model() -> pm.Model:
+    """A small model with a package holding two classifiers, one
+    specializing the other.
+    """
+    model = pm.Model(elements={})
+    namespace = pm.Element.new(
+        data={
+            "aliasIds": [],
+            "isImpliedIncluded": False,
+            "@type": "Namespace",
+            "@id": "namespace",
+            "ownedRelationship": [],
+        },
+        model=model,
+    )
+    package = pm.Element.new(
+        data={
+            "declaredName": "Package",
+            "isLibraryElement": False,
+            "filterCondition": [],
+            "ownedElement": [],
+            "@type": "Package",
+            "@id": "package",
+            "ownedRelationship": [],
+        },
+        model=model,
+    )
+    new_element_ownership_pattern(owner=namespace, ele=package, model=model)
+    vehicle = build_from_classifier_pattern(
+        owner=package,
+        name="Vehicle",
+        model=model,
+        metatype="Classifier",
+        superclasses=[],
+        specific_fields={},
+    )
+    build_from_classifier_pattern(
+        owner=package,
+        name="Car",
+        model=model,
+        metatype="Classifier",
+        superclasses=[vehicle],
+        specific_fields={},
+    )
+    return model
@@ -0,0 +1,39 @@
+from pymbe.model import Model
+from pymbe.model_modification import build_from_classifier_pattern
+
+
+def test_diff(tmp_path, small_model):
+    """Added, removed and modified elements and relationships are found."""
+    small_model.save_to_file(tmp_path / "model.json")
+    old = Model.load_from_file(tmp_path / "model.json")
+    assert not small_model.diff(old)
+    assert small_model.merkle_tree.subtree_hashes == old.merkle_tree.subtree_hashes
+
+    package = small_model.get_element("package")
+    vehicle, car = package.throughOwningMembership
+    truck = build_from_classifier_pattern(
+        owner=package,
+        name="Truck",
+        model=small_model,
+        metatype="Classifier",
+        superclasses=[vehicle],
+        specific_fields={},
+    )
+    vehicle.set("declaredName", "Automobile")
+
+    diff = old.diff(small_model)
+    assert diff.added_elements == [truck._id]
+    # the truck's membership in the package and its subclassification
+    assert set(diff.added_relationships) == (
+        set(small_model.elements) - set(old.elements) - {truck._id}
+    )
+    assert truck.owningRelationship._id in diff.added_relationships
+    # the package gained a membership, the vehicle was renamed
+    assert set(diff.modified_elements) == {package._id, vehicle._id}
+    assert diff.modified_relationships == []
+    assert car._id not in diff.modified_elements
+
+    reverse = small_model.diff(old)
+    assert sorted(reverse.removed_elements) == sorted(diff.added_elements)
+    assert sorted(reverse.removed_relationships) == sorted(diff.added_relationships)
+    assert reverse.added_elements == reverse.added_relationships == []
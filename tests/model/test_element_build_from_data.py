@@ -1,8 +1,15 @@
+import copy
+import pickle
 from uuid import uuid4
 
+import pytest
+
 import pymbe.api as pm
-from pymbe.model import Element
-from pymbe.model_modification import new_element_ownership_pattern
+from pymbe.model import Element, ElementList, ListOfNamedItems
+from pymbe.model_modification import (
+    build_from_classifier_pattern,
+    new_element_ownership_pattern,
+)
 
 
 def test_generate_element_from_dictionary():
@@ -95,3 +102,160 @@ def test_add_relationship():
 
     assert partdefinition_ele.throughFeatureMembership[0] == partusage_ele
     assert partusage_ele.reverseFeatureMembership[0] == partdefinition_ele
+
+
+def test_compact_element():
+    """Elements keep no instance dictionary, and read attributes from their data."""
+    empty_model = pm.Model(elements={})
+
+    partdefinition_data = empty_model.metamodel.pre_made_dicts["PartDefinition"]
+    partdefinition_data.update(
+        {"@type": "PartDefinition", "declaredName": "Demo Unit", "@id": str(uuid4())}
+    )
+    partdefinition_ele = Element.new(data=partdefinition_data, model=empty_model)
+
+    assert not hasattr(partdefinition_ele, "__dict__")
+    assert partdefinition_ele.declaredName == "Demo Unit"
+    assert "declaredName" in dir(partdefinition_ele)
+
+    partdefinition_ele._data["declaredName"] = "Renamed Unit"
+    assert partdefinition_ele.declaredName == "Renamed Unit"
+
+
+def test_get_related(small_model):
+    """Related elements can be found by relationship metatype, including its subtypes."""
+    package = small_model.get_element("package")
+    vehicle, car = package.throughOwningMembership
+
+    assert car.get_related("Subclassification") == [vehicle]
+    assert car.get_related("Specialization") == []
+    assert car.get_related("Specialization", include_subtypes=True) == [vehicle]
+    assert vehicle.get_related("Specialization", "reverse", include_subtypes=True) == [
+        car
+    ]
+    assert package.get_related("Membership", include_subtypes=True) == [vehicle, car]
+    assert car.get_related("Membership", "reverse", include_subtypes=True) == [package]
+
+    with pytest.raises(ValueError):
+        car.get_related("Subclassification", direction="sideways")
+
+
+def test_list_of_named_items(small_model):
+    """Items are found by name after the list, or the names of its items, change."""
+    vehicle, car = small_model.get_element("package").throughOwningMembership
+    items = ListOfNamedItems([vehicle])
+
+    assert items["Vehicle"] is vehicle
+    assert items["Car"] is None
+
+    items += [car]
+    assert items["Car"] is car
+    assert items[1] is car
+    # looking up a missing name again does not index the items again
+    name_index = items._name_index
+    assert items["Truck"] is None
+    assert items._name_index is name_index
+
+    del items[0]
+    assert items["Vehicle"] is None
+
+    car.set("declaredName", "Automobile")
+    assert items["Automobile"] is car
+    assert items["Car"] is None
+
+
+def test_element_list(small_model):
+    """Element lists find their elements, by identity or id, after they change."""
+    vehicle, car = small_model.get_element("package").throughOwningMembership
+    elements = ElementList([vehicle])
+
+    assert vehicle in elements
+    assert car not in elements
+
+    elements += [car]
+    assert car in elements
+
+    elements.remove(vehicle)
+    assert vehicle not in elements
+    assert elements == [car]
+
+    ids = ElementList([vehicle._id])
+    assert vehicle in ids
+    assert car not in ids
+
+    assert car in small_model.ownedMetatype["Classifier"]
+    assert isinstance(small_model.ownedRelationship, ElementList)
+
+
+def test_element_list_copies(small_model):
+    """Copied and unpickled element lists do not share the original's indexes."""
+    vehicle, car = small_model.get_element("package").throughOwningMembership
+    items = ListOfNamedItems([vehicle])
+    assert vehicle in items and items["Vehicle"] is vehicle
+
+    duplicate = copy.copy(items)
+    assert type(duplicate) is ListOfNamedItems
+    duplicate.append(car)
+    assert car in duplicate and car not in items
+    duplicate[0] = car
+    assert duplicate["Vehicle"] is None
+    assert items["Vehicle"] is vehicle
+
+    ids = ElementList([vehicle._id])
+    assert vehicle in ids
+    unpickled = pickle.loads(pickle.dumps(ids))
+    assert type(unpickled) is ElementList
+    unpickled.append(car._id)
+    assert car in unpickled and car not in ids
+
+
+def test_batch(small_model):
+    """Changes made in a batch are applied at its end, with the same result as
+    making them one at a time, and given to subscribers with one revision.
+    """
+    package = small_model.get_element("package")
+    vehicle = package.throughOwningMembership[0]
+    changes = []
+    small_model.subscribe(changes.append)
+
+    def build_truck(name: str):
+        return build_from_classifier_pattern(
+            owner=package,
+            name=name,
+            model=small_model,
+            metatype="Classifier",
+            superclasses=[vehicle],
+            specific_fields={},
+        )
+
+    number_of_owned = len(small_model.ownedElement)
+    revision = small_model.revision
+    truck = build_truck("Truck")
+    unbatched_changes = [(change.kind, change.attribute) for change in changes]
+    assert small_model.revision == revision + len(changes)
+    changes.clear()
+
+    revision = small_model.revision
+    number_of_relationships = len(package.ownedRelationship)
+    with small_model.batch():
+        with small_model.batch():
+            lorry = build_truck("Lorry")
+        assert small_model.get_element(lorry._id) is lorry
+        assert lorry.throughSubclassification == []
+        assert lorry not in small_model.ownedMetatype["Classifier"]
+        assert len(package.ownedRelationship) == number_of_relationships
+        assert not changes and small_model.revision == revision
+
+    assert [(change.kind, change.attribute) for change in changes] == unbatched_changes
+    assert {change.revision for change in changes} == {revision + 1}
+    assert small_model.revision == revision + 1
+    assert lorry.throughSubclassification == [vehicle]
+    assert package.throughOwningMembership[-2:] == [truck, lorry]
+    assert len(package.ownedRelationship) == number_of_relationships + 1
+    for new_element in (truck, lorry):
+        assert new_element in small_model.ownedMetatype["Classifier"]
+        assert new_element._id in small_model.all_non_relationships
+        # the builders only set the owner of a new element after adding it
+        assert new_element in small_model.ownedElement
+    assert len(small_model.ownedElement) == number_of_owned + 2
+    assert not small_model._staged.elements and not small_model._staged.changes
@@ -0,0 +1,39 @@
+from pymbe.model_modification import build_from_classifier_pattern
+
+
+def test_find(small_model):
+    """Elements are found by metatype, including its subtypes, and attribute."""
+    package = small_model.get_element("package")
+    vehicle, car = package.throughOwningMembership
+
+    assert small_model.find("Classifier") == [vehicle, car]
+    assert small_model.find("Type") == [vehicle, car]
+    assert small_model.find("Type", include_subtypes=False) == []
+    assert small_model.find("Classifier", declaredName="Car") == [car]
+    assert small_model.find(declaredName="Package") == [package]
+    assert small_model.find(
+        "Namespace", declaredName=lambda name: name.startswith("V")
+    ) == [vehicle]
+    assert small_model.find("Package", ownedElement=[]) == [package]
+    assert small_model.find("Classifier", declaredName="Boat") == []
+
+
+def test_find_follows_changes(small_model):
+    """The attribute indexes are kept up to date as the model changes."""
+    package = small_model.get_element("package")
+    vehicle, car = package.throughOwningMembership
+    assert small_model.find("Classifier", isAbstract=True) == []
+
+    vehicle.set("isAbstract", True)
+    assert small_model.find("Classifier", isAbstract=True) == [vehicle]
+
+    truck = build_from_classifier_pattern(
+        owner=package,
+        name="Truck",
+        model=small_model,
+        metatype="Classifier",
+        superclasses=[vehicle],
+        specific_fields={},
+    )
+    assert small_model.find("Classifier", declaredName="Truck") == [truck]
+    assert small_model.find("Classifier", isAbstract=False) == [car, truck]
@@ -0,0 +1,53 @@
+from pymbe.model import ChangeKind
+from pymbe.model_modification import build_from_classifier_pattern
+
+
+def test_change_events(small_model):
+    """Changes bump the model revision and are passed to the subscribers."""
+    package = small_model.get_element("package")
+    changes = []
+    unsubscribe = small_model.subscribe(changes.append)
+    revision = small_model.revision
+
+    truck = build_from_classifier_pattern(
+        owner=package,
+        name="Truck",
+        model=small_model,
+        metatype="Classifier",
+        superclasses=[],
+        specific_fields={},
+    )
+    membership = truck.owningRelationship
+
+    assert [(change.kind, change.element, change.attribute) for change in changes] == [
+        (ChangeKind.ELEMENT_ADDED, truck, None),
+        (ChangeKind.ELEMENT_ADDED, membership, None),
+        (ChangeKind.RELATIONSHIP_ADDED, membership, None),
+        (ChangeKind.ATTRIBUTE_SET, package, "ownedRelationship"),
+        (ChangeKind.ATTRIBUTE_SET, truck, "owningRelationship"),
+    ]
+    assert [change.revision for change in changes] == list(
+        range(revision + 1, revision + 6)
+    )
+    assert small_model.revision == revision + 5
+
+    unsubscribe()
+    truck.set("declaredName", "Lorry")
+    assert truck.declaredName == "Lorry"
+    assert small_model.revision == revision + 6
+    assert len(changes) == 5
+
+
+def test_caches_follow_changes(small_model):
+    """Caches computed from the model are refreshed after it changes."""
+    merkle_tree = small_model.merkle_tree
+    vehicle = small_model.get_element("package").throughOwningMembership[0]
+    assert repr(vehicle).startswith("Vehicle")
+    assert vehicle.is_in_package(small_model.get_element("package"))
+
+    vehicle.set("name", "Automobile")
+    assert repr(vehicle).startswith("Automobile")
+    assert small_model.merkle_tree is not merkle_tree
+
+    vehicle.set("owningRelationship", None)
+    assert not vehicle.is_in_package(small_model.get_element("package"))
@@ -0,0 +1,352 @@
+import io
+import json
+
+import pytest
+
+from pymbe.model import Element, Model
+from pymbe.serialization import iter_element_data, iter_json_array, write_element_data
+
+
+def as_post_format(model: Model) -> list[dict]:
+    return [
+        {"identity": {"@id": id_}, "payload": dict(element._data)}
+        for id_, element in model.elements.items()
+    ]
+
+
+def related_ids(element: Element) -> dict[str, list[str]]:
+    return {
+        key: [related._id for related in related_elements]
+        for key, related_elements in element.relationships.items()
+    }
+
+
+def count_made(model: Model) -> int:
+    """The number of elements that have been made into Element objects."""
+    return sum(isinstance(value, Element) for value in dict.values(model.elements))
+
+
+def assert_same_model(loaded: Model, expected: Model):
+    assert list(loaded.elements) == list(expected.elements)
+    for id_, element in loaded.elements.items():
+        expected_element = expected.elements[id_]
+        assert element._metatype == expected_element._metatype
+        assert element._data == expected_element._data
+        assert related_ids(element) == related_ids(expected_element)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_iter_json_array(chunk_size):
+    """Items are decoded correctly regardless of where the chunks split."""
+    items = [{"@id": "a", "values": [1, 2.5, None]}, 12345, "text, with ] chars", []]
+    text = json.dumps(items, indent=2)
+
+    assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == items
+    assert list(iter_json_array(io.StringIO(" [ ] "), chunk_size=chunk_size)) == []
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text[:-3]), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7])
+def test_iter_json_array_chunk_edges(chunk_size):
+    """Numbers, literals and strings cut between chunks are decoded whole."""
+    items = [1.5e10, -12, True, None, "a\\b\u00e9", -1.25e-3]
+    for text in (json.dumps(items), json.dumps(items, separators=(",", ":"))):
+        assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == items
+    assert list(iter_json_array(io.StringIO("[1.5e10]"), chunk_size=chunk_size)) == [
+        1.5e10
+    ]
+
+
+def test_iter_json_array_syntax_error():
+    """A syntax error is reported where it is, without reading the rest of the
+    file.
+    """
+    text = '[{"@id": "a"}, {"@id" "b"}, ' + ", ".join(["{}"] * 10_000) + "]"
+    raw_fp = io.StringIO(text)
+    with pytest.raises(ValueError, match="Expecting ':' delimiter"):
+        list(iter_json_array(raw_fp, chunk_size=64))
+    assert raw_fp.tell() < 1000
+
+
+def test_iter_element_data_formats():
+    """Both the plain and POST formats give the element data with its id."""
+    plain = [{"@id": "a", "@type": "Package"}]
+    post = [{"identity": {"@id": "a"}, "payload": {"@type": "Package"}}]
+
+    for stream in (False, True):
+        for raw_elements in (plain, post):
+            raw_fp = io.StringIO(json.dumps(raw_elements))
+            assert list(iter_element_data(raw_fp, stream=stream)) == plain
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_load_from_files(tmp_path, small_model, stream):
+    """Loading from either file format, streamed or not, rebuilds the model."""
+    model = small_model
+
+    plain_file = tmp_path / "model.json"
+    plain_file.write_text(json.dumps([e._data for e in model.elements.values()]))
+    post_file = tmp_path / "model_post.json"
+    post_file.write_text(json.dumps(as_post_format(model)))
+
+    assert_same_model(Model.load_from_file(plain_file, stream=stream), model)
+    assert_same_model(Model.load_from_post_file(post_file, stream=stream), model)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_load_from_mult_post_files(tmp_path, small_model, parallel):
+    """Split models are merged, and ids repeated across files are reported."""
+    model = small_model
+    post_data = as_post_format(model)
+
+    first_file, second_file = tmp_path / "first.json", tmp_path / "second.json"
+    first_file.write_text(json.dumps(post_data[:3]))
+    second_file.write_text(json.dumps(post_data[3:]))
+
+    loaded = Model.load_from_mult_post_files(
+        [first_file, second_file], parallel=parallel, max_workers=2
+    )
+    assert_same_model(loaded, model)
+
+    second_file.write_text(json.dumps(post_data[2:]))
+    with pytest.warns(UserWarning, match="1 element ids in more than one source"):
+        loaded = Model.load_from_mult_post_files(
+            [first_file, second_file], parallel=parallel, max_workers=2
+        )
+    assert len(loaded.elements) == len(model.elements)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_shared_references(tmp_path, small_model, stream):
+    """Loaded elements share their references, and id and metatype strings."""
+    small_model.save_to_file(tmp_path / "model.json", post_format=True)
+    model = Model.load_from_post_file(tmp_path / "model.json", stream=stream)
+
+    references = {}
+    for element in model.elements.values():
+        for value in element._data.values():
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, dict) and "@id" in item:
+                    assert references.setdefault(item["@id"], item) is item
+    assert references
+    for id_, reference in references.items():
+        if id_ in model.elements:
+            assert model.elements[id_]._id is reference["@id"]
+
+    metatypes = [element._metatype for element in model.elements.values()]
+    assert metatypes.count("Classifier") == 2
+    assert len({id(metatype) for metatype in metatypes}) == len(set(metatypes))
+
+
+@pytest.mark.parametrize("indent", [None, 0, 2])
+def test_write_element_data(indent):
+    """The streamed text is the same as dumping the whole list at once."""
+    items = [{"@id": "a", "values": [1, {"@id": "b"}], "empty": {}}, {"@id": "b"}]
+    for element_data in (items, []):
+        raw_fp = io.StringIO()
+        write_element_data(raw_fp, element_data, indent=indent)
+        assert raw_fp.getvalue() == json.dumps(element_data, indent=indent)
+
+    raw_fp = io.StringIO()
+    write_element_data(raw_fp, items, indent=indent, post_format=True)
+    raw_fp.seek(0)
+    assert list(iter_element_data(raw_fp)) == items
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_save_to_file(tmp_path, small_model, compress):
+    """Saved models, compressed or not and in either format, load back."""
+    model = small_model
+    suffix = ".json.gz" if compress else ".json"
+
+    model.save_to_file(tmp_path / "model", compress=compress)
+    assert_same_model(Model.load_from_file(tmp_path / f"model{suffix}"), model)
+
+    model.save_to_file(tmp_path / "post.json", compress=compress, post_format=True)
+    loaded = Model.load_from_post_file(tmp_path / f"post{suffix}", stream=True)
+    assert_same_model(loaded, model)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_ndjson(tmp_path, small_model, parallel):
+    """NDJSON files load back, and appended lines update the elements."""
+    model = small_model
+    filepath = tmp_path / "model.ndjson"
+
+    model.save_to_ndjson_file(filepath, post_format=True)
+    assert len(filepath.read_text().splitlines()) == len(model.elements)
+    loaded = Model.load_from_ndjson_file(filepath, parallel=parallel, max_workers=3)
+    assert_same_model(loaded, model)
+
+    element = next(iter(model.elements.values()))
+    element._data["declaredName"] = "Renamed"
+    model.save_to_ndjson_file(filepath, append=True, elements=[element])
+    loaded = Model.load_from_ndjson_file(filepath, parallel=parallel, max_workers=3)
+    assert list(loaded.elements) == list(model.elements)
+    assert loaded.elements[element._id].declaredName == "Renamed"
+
+    model.save_to_ndjson_file(tmp_path / "model", compress=True)
+    loaded = Model.load_from_ndjson_file(
+        tmp_path / "model.ndjson.gz", parallel=parallel
+    )
+    assert_same_model(loaded, model)
+
+    (tmp_path / "empty.ndjson").write_text("")
+    loaded = Model.load_from_ndjson_file(tmp_path / "empty.ndjson", parallel=parallel)
+    assert not loaded.elements
+
+
+def test_lazy_load(tmp_path, small_model):
+    """Lazily loaded elements are only made when used, and match the eagerly
+    loaded ones.
+    """
+    model_file = tmp_path / "model.json"
+    model_file.write_text(
+        json.dumps([element._data for element in small_model.elements.values()])
+    )
+    eager = Model.load_from_file(model_file)
+    lazy = Model.load_from_file(model_file, lazy=True)
+
+    assert count_made(lazy) == len(lazy.ownedElement) + len(lazy.ownedRelationship)
+    assert list(lazy.elements) == list(eager.elements)
+
+    car_id = next(
+        id_
+        for id_, element in eager.elements.items()
+        if element._data.get("declaredName") == "Car"
+    )
+    made_before = count_made(lazy)
+    car = lazy.get_element(car_id)
+    assert count_made(lazy) == made_before + 1
+    assert related_ids(car) == related_ids(eager.elements[car_id])
+    assert car.throughSubclassification[0].declaredName == "Vehicle"
+
+    assert [element._id for element in lazy.packages] == ["package"]
+    assert lazy.all_relationships.keys() == eager.all_relationships.keys()
+    for id_, element in lazy.elements.items():
+        assert related_ids(element) == related_ids(eager.elements[id_])
+    assert count_made(lazy) == len(lazy.elements)
+
+    assert lazy.ownedMetatype.keys() == eager.ownedMetatype.keys()
+    for metatype, elements in eager.ownedMetatype.items():
+        assert [element._id for element in lazy.ownedMetatype[metatype]] == [
+            element._id for element in elements
+        ]
+
+
+def test_snapshot(tmp_path, small_model):
+    """A model opened from a snapshot only decodes the elements that are used,
+    and matches the saved model.
+    """
+    # reload the model, so only the actual roots are in its owned elements
+    model = Model.load([element._data for element in small_model.elements.values()])
+    snapshot_file = tmp_path / "model.snapshot"
+    model.save_snapshot(snapshot_file)
+    opened = Model.open_snapshot(snapshot_file)
+
+    assert opened.name == model.name
+    assert [element._id for element in opened.ownedElement] == ["namespace"]
+    assert count_made(opened) == 1
+
+    car_id = model.ownedMetatype["Classifier"][1]._id
+    car = opened.get_element(car_id)
+    assert count_made(opened) == 2
+    assert car.throughSubclassification[0].declaredName == "Vehicle"
+
+    assert_same_model(opened, model)
+    assert {
+        metatype: [element._id for element in elements]
+        for metatype, elements in opened.ownedMetatype.items()
+    } == {
+        metatype: [element._id for element in elements]
+        for metatype, elements in model.ownedMetatype.items()
+    }
+    assert list(opened.all_relationships) == list(model.all_relationships)
+
+    (tmp_path / "model.json").write_text("[]")
+    with pytest.raises(ValueError):
+        Model.open_snapshot(tmp_path / "model.json")
+
+
+def test_load_cached(tmp_path, monkeypatch, small_model):
+    """The built model is cached, and rebuilt when its source file changes."""
+    monkeypatch.setenv("PYMBE_CACHE_DIR", str(tmp_path / "cache"))
+    model_file = tmp_path / "model.json"
+    model_file.write_text(
+        json.dumps([element._data for element in small_model.elements.values()])
+    )
+
+    built = Model.load_cached(model_file)
+    assert built._snapshot is None
+    (cache_file,) = (tmp_path / "cache" / "models").glob("model-*.snapshot")
+
+    cached = Model.load_cached(model_file)
+    assert cached._snapshot is not None
+    assert cached.name == "model.json"
+    assert_same_model(cached, built)
+    car = cached.ownedMetatype["Classifier"][1]
+    assert car._derived["label"] == built.get_element(car._id)._derived["label"]
+
+    # a corrupted cache is rebuilt rather than failing the load
+    cache_file.write_bytes(b"corrupted")
+    assert Model.load_cached(model_file)._snapshot is None
+    assert Model.load_cached(model_file)._snapshot is not None
+
+    model_file.write_text(
+        json.dumps([element._data for element in small_model.elements.values()][:-1])
+    )
+    assert Model.load_cached(model_file)._snapshot is None
+    # the snapshot of the older version is replaced
+    (new_cache_file,) = (tmp_path / "cache" / "models").glob("model-*.snapshot")
+    assert new_cache_file != cache_file
+
+
+def test_load_cached_keys(tmp_path, monkeypatch, small_model):
+    """Files with the same name in other directories keep their own snapshots,
+    and a new version of pymbe does not use the snapshots of older versions.
+    """
+    monkeypatch.setenv("PYMBE_CACHE_DIR", str(tmp_path / "cache"))
+    all_data = [element._data for element in small_model.elements.values()]
+    model_files = []
+    for directory, data in (("first", all_data), ("second", all_data[:-1])):
+        (tmp_path / directory).mkdir()
+        model_file = tmp_path / directory / "model.json"
+        model_file.write_text(json.dumps(data))
+        model_files.append(model_file)
+
+    for model_file in model_files:
+        assert Model.load_cached(model_file)._snapshot is None
+    for model_file in model_files:
+        assert Model.load_cached(model_file)._snapshot is not None
+    assert len(list((tmp_path / "cache" / "models").glob("model-*.snapshot"))) == 2
+
+    monkeypatch.setattr("pymbe.__version__", "0.0.0-other")
+    assert Model.load_cached(model_files[0])._snapshot is None
+    assert Model.load_cached(model_files[0])._snapshot is not None
+    assert len(list((tmp_path / "cache" / "models").glob("model-*.snapshot"))) == 2
+
+
+def test_save_lazy_models(tmp_path, small_model):
+    """Lazily loaded and snapshot models are saved without making all their
+    elements.
+    """
+    all_data = [element._data for element in small_model.elements.values()]
+    model_file = tmp_path / "model.json"
+    model_file.write_text(json.dumps(all_data))
+    lazy = Model.load_from_file(model_file, lazy=True)
+    snapshot_file = tmp_path / "model.snapshot"
+    Model.load(all_data).save_snapshot(snapshot_file)
+    opened = Model.open_snapshot(snapshot_file)
+
+    for name, model in (("lazy", lazy), ("opened", opened)):
+        made_before = count_made(model)
+        model.save_to_file(tmp_path / f"{name}.json")
+        model.save_to_ndjson_file(tmp_path / f"{name}.ndjson")
+        assert count_made(model) == made_before
+        assert json.loads((tmp_path / f"{name}.json").read_text()) == all_data
+        assert [
+            json.loads(line)
+            for line in (tmp_path / f"{name}.ndjson").read_text().splitlines()
+        ] == all_data
@@ -0,0 +1,91 @@
+import pytest
+
+from pymbe.model import Element
+from pymbe.model_modification import build_from_classifier_pattern
+
+
+def get_classifier(model, name: str) -> Element:
+    return next(
+        element
+        for element in model.ownedMetatype["Classifier"]
+        if element.declaredName == name
+    )
+
+
+def test_overlay(small_model):
+    """Overlays change copies of the elements they touch, not their base."""
+    base = small_model
+    base_size = len(base.elements)
+    base_package = base.get_element("package")
+    base_relationships = list(base_package._data["ownedRelationship"])
+
+    overlay = base.overlay()
+    other_overlay = base.overlay()
+    assert len(overlay.elements) == base_size
+    assert not overlay._shared_ids
+
+    package = overlay.get_element("package")
+    vehicle = get_classifier(overlay, "Vehicle")
+    assert package is not base_package
+    assert package._data is base_package._data
+    assert vehicle._model is overlay
+
+    truck = build_from_classifier_pattern(
+        owner=package,
+        name="Truck",
+        model=overlay,
+        metatype="Classifier",
+        superclasses=[vehicle],
+        specific_fields={},
+    )
+    assert len(overlay.elements) > base_size
+    assert truck in overlay.ownedMetatype["Classifier"]
+    assert truck.throughSubclassification == [vehicle]
+    assert truck in vehicle.reverseSubclassification
+    assert truck.owningRelationship in package.ownedRelationship
+    assert package._data is not base_package._data
+    # elements reached through the base's derived relationships are the overlay's
+    assert get_classifier(overlay, "Car").throughSubclassification == [vehicle]
+
+    # the base and the other overlays are untouched
+    assert len(base.elements) == base_size
+    assert base_package._data["ownedRelationship"] == base_relationships
+    assert truck not in get_classifier(base, "Vehicle").reverseSubclassification
+    assert "Truck" not in [
+        element.declaredName for element in other_overlay.ownedMetatype["Classifier"]
+    ]
+
+    with pytest.raises(ValueError, match="read-only"):
+        base_package.set("declaredName", "Changed")
+
+    # overlays can be layered over overlays
+    scenario = overlay.overlay()
+    get_classifier(scenario, "Truck").set("declaredName", "Lorry")
+    assert get_classifier(scenario, "Lorry").throughSubclassification[0] is (
+        scenario.get_element(vehicle._id)
+    )
+    assert truck.declaredName == "Truck"
+
+
+def test_overlay_labels(small_model):
+    """Labels worked out in an overlay stay in it."""
+    base = small_model
+    vehicle = get_classifier(base, "Vehicle")
+    paint = Element.new(
+        data={
+            "@type": "Feature",
+            "@id": "paint",
+            "name": "paint",
+            "type": [{"@id": vehicle._id}],
+            "ownedRelationship": [],
+        },
+        model=base,
+    )
+    overlay = base.overlay()
+    other_overlay = base.overlay()
+
+    overlay.get_element(vehicle._id).set("name", "Renamed")
+    assert repr(overlay.get_element("paint")) == "paint: Renamed «Feature»"
+    assert "label" not in paint._derived
+    assert repr(paint) == "paint: Vehicle «Feature»"
+    assert repr(other_overlay.get_element("paint")) == "paint: Vehicle «Feature»"
@@ -0,0 +1,78 @@
+from pymbe.model_modification import build_from_classifier_pattern
+
+
+def test_ownership_index(small_model):
+    """The ownership index agrees with walking up the owners of each element."""
+    ownership = small_model.ownership
+
+    for id_, element in small_model.elements.items():
+        owner_ids = []
+        owner = element.get_owner()
+        while owner is not None:
+            owner_ids.append(owner._id)
+            owner = owner.get_owner()
+        assert ownership.get_owner_ids(id_) == owner_ids
+        assert ownership.get_depth(id_) == len(owner_ids)
+        for other_id in small_model.elements:
+            assert ownership.is_under(id_, other_id) == (other_id in owner_ids)
+
+    assert ownership.get_subtree("namespace", include_self=True) == ownership.ids
+    assert sorted(ownership.get_subtree("package")) == sorted(
+        id_ for id_ in small_model.elements if "package" in ownership.get_owner_ids(id_)
+    )
+
+
+def test_ownership_index_rebuilt(small_model):
+    """The index is rebuilt when elements are added or change owner, but not
+    after other changes.
+    """
+    package = small_model.get_element("package")
+    ownership = small_model.ownership
+    vehicle = package.throughOwningMembership[0]
+
+    vehicle.set("declaredName", "Automobile")
+    assert small_model.ownership is ownership
+
+    truck = build_from_classifier_pattern(
+        owner=package,
+        name="Truck",
+        model=small_model,
+        metatype="Classifier",
+        superclasses=[],
+        specific_fields={},
+    )
+    assert small_model.ownership is not ownership
+    assert truck.is_in_package(package)
+    assert truck._id in small_model.ownership.get_subtree("package")
+
+
+def test_is_in_package_with_stale_ownership(small_model, monkeypatch):
+    """Packages are found by walking up the owners of elements added or moved
+    since the index was built, which is only rebuilt after many queries.
+    """
+    monkeypatch.setattr("pymbe.model.STALE_OWNERSHIP_QUERIES", 1)
+    package = small_model.get_element("package")
+    namespace = small_model.get_element("namespace")
+    vehicle, car = package.throughOwningMembership
+    ownership = small_model.ownership
+
+    truck = build_from_classifier_pattern(
+        owner=vehicle,
+        name="Truck",
+        model=small_model,
+        metatype="Classifier",
+        superclasses=[],
+        specific_fields={},
+    )
+    assert truck.is_in_package(package)
+    # the package is not in the vehicle's subtree anymore once it is moved
+    vehicle.owningRelationship.set("owningRelatedElement", {"@id": namespace._id})
+    assert not truck.is_in_package(package)
+    assert car.is_in_package(package)
+    assert small_model._ownership is ownership
+
+    for _ in range(len(ownership.ids)):
+        assert not truck.is_in_package(package)
+    assert small_model._ownership is not ownership
+    assert not small_model._ownership_is_stale
+    assert not small_model.ownership.is_under(truck._id, package._id)
@@ -0,0 +1,50 @@
+from pymbe.model_modification import build_from_classifier_pattern
+
+
+def test_qualified_name_lookup(small_model):
+    """Elements are found by their qualified names, which start with the name
+    of the top package under the unnamed root namespace.
+    """
+    package = small_model.get_element("package")
+    vehicle = package.throughOwningMembership[0]
+    qualified_names = small_model.qualified_names
+
+    assert qualified_names.get("Package") == ["package"]
+    assert qualified_names.get(["Package", "Vehicle"]) == [vehicle._id]
+    assert qualified_names.get_qualified_name(vehicle._id) == "Package::Vehicle"
+    assert small_model.get_elements_by_qualified_name("Package::Vehicle") == [vehicle]
+    assert qualified_names.get("Package::Boat") == []
+    assert qualified_names.get_qualified_name("namespace") is None
+
+    under_package = {
+        id_
+        for id_ in small_model.ownership.get_subtree("package")
+        if qualified_names.get_qualified_name(id_)
+    }
+    assert set(qualified_names.get_ids_under("Package")) == under_package
+    assert "Package::Vehicle" in qualified_names
+
+
+def test_qualified_names_follow_changes(small_model):
+    """The index is kept up to date as elements are added and renamed."""
+    package = small_model.get_element("package")
+    qualified_names = small_model.qualified_names
+
+    truck = build_from_classifier_pattern(
+        owner=package,
+        name="Truck",
+        model=small_model,
+        metatype="Classifier",
+        superclasses=[],
+        specific_fields={},
+    )
+    assert small_model.qualified_names is qualified_names
+    assert qualified_names.get("Package::Truck") == [truck._id]
+
+    truck.set("declaredName", "Lorry")
+    assert qualified_names.get("Package::Truck") == []
+    assert qualified_names.get("Package::Lorry") == [truck._id]
+
+    package.set("declaredName", "Fleet")
+    assert qualified_names.get_ids_under("Package") == []
+    assert qualified_names.get_qualified_name(truck._id) == "Fleet::Lorry"
@@ -0,0 +1,45 @@
+import pytest
+
+from pymbe.model import Element, Model
+from pymbe.query.metamodel_navigator import get_more_general_types
+
+
+def test_referenced_model_index(small_model):
+    """Elements of referenced models, and of the models they reference, are
+    routed to the model holding them.
+    """
+    library = small_model
+    middle = Model(elements={})
+    middle.reference_other_model(library)
+    model = Model(elements={})
+    model.reference_other_model(middle)
+
+    vehicle = library.get_element("package").ownedMember[0]
+    assert model.get_referenced_model(vehicle._id) is library
+    assert model.get_element(vehicle._id) is vehicle
+    assert model.get_referenced_model("missing") is None
+    with pytest.raises(KeyError):
+        model.get_element("missing")
+
+    # elements added to a referenced model later are still found, and indexed
+    added = Element.new(data={"@type": "Namespace", "@id": "added"}, model=library)
+    assert model.get_referenced_model("added") is None
+    assert model.get_element("added") is added
+    assert model.get_referenced_model("added") is library
+
+
+def test_more_general_library_types(small_model):
+    """More general types that are in a referenced model are taken from it."""
+    library = small_model
+    car = next(
+        element
+        for element in library.ownedMetatype["Classifier"]
+        if element.declaredName == "Car"
+    )
+    model = Model.load([dict(element._data) for element in library.elements.values()])
+    model.reference_other_model(library)
+
+    local_car = model.get_element(car._id)
+    assert car.throughSubclassification
+    assert local_car is not car
+    assert get_more_general_types(local_car, 1, 1) == car.throughSubclassification
@@ -0,0 +1,72 @@
+import gc
+
+import pytest
+
+from pymbe.library import freeze_for_fork, get_shared_library, set_shared_library
+from pymbe.model import Element, Model
+from pymbe.model_modification import build_from_classifier_pattern
+
+
+@pytest.fixture
+def shared_library(small_model):
+    set_shared_library(small_model)
+    yield get_shared_library()
+    set_shared_library(None)
+
+
+def test_shared_library_is_read_only(shared_library):
+    """Models can build on the shared library, but not change it."""
+    vehicle = next(
+        element
+        for element in shared_library.ownedMetatype["Classifier"]
+        if element.declaredName == "Vehicle"
+    )
+    library_size = len(shared_library.elements)
+    subclassifications = list(vehicle.reverseSubclassification)
+
+    with pytest.raises(ValueError, match="read-only"):
+        vehicle.set("declaredName", "Changed")
+    with pytest.raises(ValueError, match="read-only"):
+        build_from_classifier_pattern(
+            owner=shared_library.get_element("package"),
+            name="Truck",
+            model=Model(elements={}),
+            metatype="Classifier",
+            superclasses=[],
+            specific_fields={},
+        )
+
+    model = Model(elements={})
+    model.reference_other_model(shared_library)
+    package = Element.new(
+        data={"@type": "Package", "@id": "user_package", "ownedRelationship": []},
+        model=model,
+    )
+    truck = build_from_classifier_pattern(
+        owner=package,
+        name="Truck",
+        model=model,
+        metatype="Classifier",
+        superclasses=[vehicle],
+        specific_fields={},
+    )
+
+    assert truck.throughSubclassification == [vehicle]
+    assert model.get_element(vehicle._id) is vehicle
+    assert vehicle.reverseSubclassification == subclassifications
+    assert len(shared_library.elements) == library_size
+
+
+def test_freeze_for_fork(shared_library):
+    """Sharing the library leaves the garbage collector alone, freezing it
+    for a fork is opt-in.
+    """
+    gc.unfreeze()
+    set_shared_library(shared_library)
+    assert gc.get_freeze_count() == 0
+
+    try:
+        assert freeze_for_fork() is shared_library
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
@@ -0,0 +1,84 @@
+import marshal
+
+from pymbe.metamodel import (
+    MetaModel,
+    get_shared_metamodel,
+    load_metahints,
+    shared_metamodel_override,
+)
+from pymbe.model import Model
+
+
+def test_models_share_metamodel():
+    """Models without an explicit metamodel reuse the process-wide one."""
+    first_model = Model(elements={})
+    second_model = Model(elements={})
+
+    assert first_model.metamodel is get_shared_metamodel()
+    assert second_model.metamodel is first_model.metamodel
+    assert second_model._metamodel_hints is first_model._metamodel_hints
+
+
+def test_templates_are_not_shared():
+    """Filling in a template must not leak into the next element created."""
+    metamodel = get_shared_metamodel()
+
+    part_data = metamodel.pre_made_dicts["PartDefinition"]
+    part_data.update({"declaredName": "Demo Unit"})
+    part_data["ownedRelationship"].append({"@id": "not-shared"})
+
+    fresh_data = metamodel.pre_made_dicts["PartDefinition"]
+    assert fresh_data["declaredName"] == ""
+    assert fresh_data["ownedRelationship"] == []
+
+
+def test_inject_custom_metamodel():
+    """A custom metamodel can be given to a single model or to every model."""
+    custom_metamodel = MetaModel()
+
+    assert Model(elements={}, metamodel=custom_metamodel).metamodel is custom_metamodel
+
+    with shared_metamodel_override(custom_metamodel):
+        assert Model(elements={}).metamodel is custom_metamodel
+
+    assert Model(elements={}).metamodel is not custom_metamodel
+
+
+def test_metahints_cache(tmp_path, monkeypatch):
+    """The hints are marshalled on first load and read back from the cache."""
+    monkeypatch.setenv("PYMBE_CACHE_DIR", str(tmp_path))
+    stale_cache = tmp_path / "attribute_metadata-0000000000000000.pickle"
+    stale_cache.write_bytes(b"outdated")
+
+    uncached_hints = load_metahints(use_cache=False)
+    assert load_metahints() == uncached_hints
+
+    (cache_file,) = tmp_path.glob("attribute_metadata-*.marshal")
+    assert cache_file != stale_cache
+    assert load_metahints() == uncached_hints
+
+    # a corrupted cache is rebuilt rather than failing the load
+    cache_file.write_bytes(b"corrupted")
+    assert load_metahints() == uncached_hints
+    assert cache_file.read_bytes() != b"corrupted"
+
+    # so is a well-formed cache that does not hold hints
+    for not_hints in ([], 0):
+        cache_file.write_bytes(marshal.dumps(not_hints))
+        assert load_metahints() == uncached_hints
+
+
+def test_templates_built_on_demand():
+    """Templates are only built for the metatypes that are asked for."""
+    metamodel = MetaModel()
+    assert not metamodel.pre_made_dicts._templates
+
+    part_data = metamodel.pre_made_dicts["PartUsage"]
+    assert set(metamodel.pre_made_dicts._templates) == {"PartUsage"}
+    assert part_data["ownedRelationship"] == []
+    assert (
+        part_data["ownedRelationship"]
+        is not (metamodel.pre_made_dicts["PartUsage"]["ownedRelationship"])
+    )
+    assert "PartUsage" in metamodel.pre_made_dicts
+    assert len(metamodel.pre_made_dicts) == len(metamodel.metamodel_hints)